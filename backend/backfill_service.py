@@ -6,7 +6,7 @@ be read by an API endpoint.
 """
 from __future__ import annotations
 
-import json
+from json.encoder import encode_basestring_ascii
 import sqlite3
 import threading
 import time
@@ -17,6 +17,7 @@ from typing import Iterable, List, Dict, Optional
 import requests
 
 from .config import settings
+from .search_sqlite import rebuild_trigram_index
 
 
 class BackfillStatus:
@@ -59,15 +60,18 @@ class BackfillService:
         cur.executemany(
             "INSERT INTO steam_apps(app_id, name, raw, last_seen) VALUES (?, ?, ?, datetime('now')) "
             "ON CONFLICT(app_id) DO UPDATE SET name=excluded.name, raw=excluded.raw, last_seen=datetime('now')",
-            [(r["app_id"], r["name"], json.dumps(r)) for r in rows],
+            # Same text json.dumps(r) gives for an {app_id, name} dict, without serializing the dict
+            ((r["app_id"], r["name"], f'{{"app_id": {r["app_id"]}, "name": {encode_basestring_ascii(r["name"])}}}') for r in rows),
         )
         conn.commit()
 
     def _populate_fts(self, conn: sqlite3.Connection) -> None:
         cur = conn.cursor()
-        cur.execute("DELETE FROM steam_apps_fts;")
-        cur.execute("INSERT INTO steam_apps_fts(rowid, name) SELECT app_id, name FROM steam_apps;")
+        # 'rebuild' regenerates the external-content index from steam_apps in one pass
+        cur.execute("INSERT INTO steam_apps_fts(steam_apps_fts) VALUES('rebuild');")
+        cur.execute("INSERT INTO steam_apps_fts(steam_apps_fts) VALUES('optimize');")
         conn.commit()
+        rebuild_trigram_index(conn)
 
     def _fetch_applist(self) -> List[Dict]:
         url = f"{settings.STEAM_API_BASE_URL}/ISteamApps/GetAppList/v2/"
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import Optional
 
 
@@ -16,10 +17,17 @@ class Settings:
 
 	# App behavior
 	REQUEST_TIMEOUT_SECONDS: int = int(os.getenv("REQUEST_TIMEOUT_SECONDS", "20"))
+	# Games scraped concurrently; the rpm budget is split between them
+	SCRAPER_MAX_PARALLEL_GAMES: int = int(os.getenv("SCRAPER_MAX_PARALLEL_GAMES", "1"))
 
 	# Prompts storage directory (not hard-coded; can be overridden via env)
 	PROMPTS_DIR: str = os.getenv("PROMPTS_DIR", "./prompts")
 
+	# Directory where background review exports are written before download
+	EXPORTS_DIR: str = os.getenv(
+		"EXPORTS_DIR", os.path.join(tempfile.gettempdir(), "review_exports")
+	)
+
 
 settings = Settings()
 
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
 from . import models, schemas
@@ -211,6 +211,15 @@ def list_api_keys(db: Session) -> List[models.ApiKey]:
     return db.query(models.ApiKey).order_by(models.ApiKey.provider.asc(), models.ApiKey.name.asc()).all()
 
 
+def list_api_key_metadata(db: Session):
+    """Return non-sensitive API key columns as plain rows (no ORM hydration, no key material)."""
+    k = models.ApiKey
+    return db.execute(
+        select(k.id, k.provider, k.name, k.notes, k.created_at, k.updated_at, k.masked_key)
+        .order_by(k.provider.asc(), k.name.asc())
+    ).all()
+
+
 def get_api_key(db: Session, key_id: int) -> Optional[models.ApiKey]:
     return db.query(models.ApiKey).filter(models.ApiKey.id == key_id).first()
 
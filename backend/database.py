@@ -1,14 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from .config import settings
 
 
-engine = create_engine(
-	settings.DATABASE_URL,
-	connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
+def _engine_kwargs(url: str) -> dict:
+	"""Dialect-specific engine options for the configured database URL."""
+	if url.startswith("sqlite"):
+		if url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url:
+			# Each pooled connection would get its own empty in-memory
+			# database; share a single connection instead (used by tests)
+			return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+		return {"connect_args": {"check_same_thread": False}}
+	if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+		# Rewrite executemany() batches (e.g. bulk review inserts) into multi-row statements
+		return {"executemany_mode": "values_plus_batch", "insertmanyvalues_page_size": 1000}
+	return {}
+
+
+# Applied to every new SQLite connection: WAL lets readers (review listings,
+# exports) proceed while the scraper commits, and the larger page cache/mmap
+# keep index scans over `reviews` in memory. page_size only applies to a new
+# (still empty) database file, so it has to precede journal_mode.
+SQLITE_PRAGMAS = (
+	"PRAGMA page_size=8192",
+	"PRAGMA journal_mode=WAL",
+	"PRAGMA synchronous=NORMAL",
+	"PRAGMA temp_store=MEMORY",
+	"PRAGMA mmap_size=268435456",
+	"PRAGMA cache_size=-65536",
 )
 
+
+def _set_sqlite_pragmas(dbapi_conn, _record) -> None:
+	cur = dbapi_conn.cursor()
+	try:
+		for pragma in SQLITE_PRAGMAS:
+			cur.execute(pragma)
+	finally:
+		cur.close()
+
+
+def create_engine_for_url(url: str) -> Engine:
+	"""Engine for `url` with the app's dialect options and SQLite pragmas."""
+	new_engine = create_engine(url, **_engine_kwargs(url))
+	if new_engine.dialect.name == "sqlite":
+		event.listen(new_engine, "connect", _set_sqlite_pragmas)
+	return new_engine
+
+
+engine = create_engine_for_url(settings.DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -21,5 +65,3 @@ def get_db():
 		yield db
 	finally:
 		db.close()
-
-
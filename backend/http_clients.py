@@ -0,0 +1,72 @@
+"""Shared outbound HTTP client.
+
+Scrapes, real-time searches and applist fetches all talk to the same Steam
+hosts, so they share one pooled `httpx.AsyncClient`: keep-alive connections
+(and HTTP/2 streams, when `h2` is installed) are reused instead of paying a
+TCP+TLS handshake per call.
+
+Compression needs no setup here: httpx sends `Accept-Encoding: gzip, deflate`
+by default, adds `br` when the `brotli` package is importable, and decodes
+responses transparently. Setting the header by hand could advertise an
+encoding this install can't decode.
+"""
+import asyncio
+from typing import Optional
+
+import httpx
+
+from .config import settings
+
+try:
+	import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+	_HTTP2_AVAILABLE = True
+except Exception:
+	_HTTP2_AVAILABLE = False
+
+
+_client: Optional[httpx.AsyncClient] = None
+# Loop the client was created on; its connections can't be used from another
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_client() -> httpx.AsyncClient:
+	# The client ignores `limits`/`http2` when given a transport, so they
+	# are set on the transport. Its retries cover connect errors only.
+	return httpx.AsyncClient(
+		timeout=settings.REQUEST_TIMEOUT_SECONDS,
+		transport=httpx.AsyncHTTPTransport(
+			limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
+			http2=_HTTP2_AVAILABLE,
+			retries=2,
+		),
+	)
+
+
+def get_client() -> httpx.AsyncClient:
+	"""Return the shared client, creating it on the running event loop if needed.
+
+	A client is bound to the loop it was created on and has to be closed
+	there (`close_client`, the app's shutdown hook) before another loop can
+	get one; replacing it silently would leak its connection pool.
+	"""
+	global _client, _client_loop
+	loop = asyncio.get_running_loop()
+	if _client is None:
+		_client = _create_client()
+		_client_loop = loop
+	elif _client_loop is not loop:
+		raise RuntimeError("The shared HTTP client belongs to another event loop; close_client() must be awaited there first")
+	return _client
+
+
+async def open_client() -> None:
+	"""Startup hook: create the client inside the server's event loop."""
+	get_client()
+
+
+async def close_client() -> None:
+	"""Shutdown hook: close the shared client's connections."""
+	global _client, _client_loop
+	client, _client, _client_loop = _client, None, None
+	if client is not None:
+		await client.aclose()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .routers import games, scraper, reviews, analysis
 from fastapi.staticfiles import StaticFiles
@@ -17,10 +18,27 @@ def create_app() -> FastAPI:
 		allow_methods=["*"],
 		allow_headers=["*"],
 	)
+	# Compress larger responses (review exports, long listings) for clients that accept gzip
+	app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=1)
+
+	# Shared outbound HTTP client: created inside the server's event loop,
+	# closed with the app; the XLSX worker pool goes down with it
+	from . import http_clients
+	app.add_event_handler("startup", http_clients.open_client)
+	app.add_event_handler("shutdown", http_clients.close_client)
+	app.add_event_handler("shutdown", reviews.shutdown_xlsx_pool)
 
 	# Create DB tables using current engine (import lazily to pick up env changes)
 	from .database import Base, engine
 	Base.metadata.create_all(bind=engine)
+	# create_all only emits indexes alongside new tables; add any declared
+	# indexes that are missing from tables created by an older version.
+	for table in Base.metadata.sorted_tables:
+		for index in table.indexes:
+			try:
+				index.create(bind=engine, checkfirst=True)
+			except Exception as e:
+				print(f"Index creation failed for {index.name}: {e}")
 
 	# Run simple migrations for local SQLite DB (add missing columns)
 	from .config import settings
@@ -41,6 +59,11 @@ def create_app() -> FastAPI:
 				except Exception:
 					# ignore migration failure
 					pass
+			# Build the trigram name index once for applists loaded before it existed
+			cur.execute("SELECT name FROM sqlite_master WHERE name IN ('steam_apps', 'steam_apps_trigram')")
+			if [r[0] for r in cur.fetchall()] == ['steam_apps']:
+				from .search_sqlite import rebuild_trigram_index
+				rebuild_trigram_index(conn)
 			cur.close()
 			conn.close()
 		except Exception as e:
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -45,6 +45,36 @@ class Review(Base):
 
 	game = relationship("Game", back_populates="reviews")
 
+	__table_args__ = (
+		# Serves the /reviews and analysis listings (by app, newest first) and
+		# their counts; the review_type filter is checked from the index entries
+		Index(
+			"ix_reviews_app_date_covering",
+			"app_id", review_date.desc(), "review_type", "language", "playtime_hours",
+		),
+		# Answers the scraper's per-game resume/count lookup (newest matching
+		# review + number of matches) from the index alone, seeking on language
+		Index(
+			"ix_reviews_app_lang_date_scrape",
+			"app_id", "language", review_date.desc(), "early_access", "received_for_free", "playtime_hours",
+		),
+	)
+
+
+class ScrapeState(Base):
+	"""Cached resume counters for a game under the filters of its last scrape.
+
+	Lets the scraper skip the per-game COUNT/MAX over `reviews` when it is
+	started again with the same filters.
+	"""
+	__tablename__ = "scrape_state"
+
+	app_id = Column(Integer, ForeignKey("games.app_id"), primary_key=True)
+	filter_hash = Column(String, nullable=False)
+	existing_count = Column(Integer, default=0, nullable=False)
+	latest_review_date = Column(DateTime, nullable=True)
+	updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 
 
 class Setting(Base):
@@ -67,10 +67,16 @@ def search_local_games(
 	start: int = Query(0, ge=0),
 	count: int = Query(200, ge=1, le=1000),
 ):
-	"""Search the local SQLite applist (FTS5). Returns paginated results and a total count."""
+	"""Search the local SQLite applist (FTS5). Returns paginated results and a total count.
+
+	Name searches don't count every match: when `has_more` is set, `total`
+	is a lower bound.
+	"""
 	games, total = search_sqlite.search_local_apps(query, start=start, count=count)
 	objs = [schemas.GameCreate(app_id=int(g["app_id"]), name=g["name"]) for g in games]
-	return schemas.GameSearchResponse(games=objs, total=total, start=start, count=count)
+	return schemas.GameSearchResponse(
+		games=objs, total=total, start=start, count=count, has_more=total > start + len(objs)
+	)
 
 
 @router.get("/search_local_reviews", response_model=schemas.GameSearchResponse)
@@ -82,7 +88,9 @@ def search_local_games_with_reviews(
     """Search local applist but only return apps that have reviews in the local DB."""
     games, total = search_sqlite.search_local_apps_with_reviews(query, start=start, count=count)
     objs = [schemas.GameCreate(app_id=int(g["app_id"]), name=g["name"]) for g in games]
-    return schemas.GameSearchResponse(games=objs, total=total, start=start, count=count)
+    return schemas.GameSearchResponse(
+        games=objs, total=total, start=start, count=count, has_more=total > start + len(objs)
+    )
 
 
 @router.get("/backfill/status")
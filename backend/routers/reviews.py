@@ -1,15 +1,24 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import exists, func
 
-from ..database import get_db
+from ..config import settings
+from ..database import SessionLocal, get_db
 from .. import models, schemas
 
+import asyncio
 import io
 import csv
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from datetime import datetime, timezone
 try:
     from openpyxl import Workbook
 except Exception:
@@ -36,13 +45,11 @@ def list_reviews(
     if review_type is not None:
         q = q.filter(models.Review.review_type == review_type)
     # Date parsing: expect YYYY-MM-DD strings
-    from datetime import datetime, timezone
-
     if start_date:
-        sd = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        sd = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc)
         q = q.filter(models.Review.review_date >= sd)
     if end_date:
-        ed = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        ed = datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc)
         q = q.filter(models.Review.review_date <= ed)
 
     total = q.with_entities(func.count()).scalar() or 0
@@ -64,8 +71,9 @@ def delete_reviews_by_game(
     if dry_run:
         return {"app_id": app_id, "deleted_count": count, "dry_run": True}
 
-    # Perform delete
+    # Perform delete; the scraper's cached counters for this game are now stale
     q.delete(synchronize_session=False)
+    db.query(models.ScrapeState).filter(models.ScrapeState.app_id == app_id).delete(synchronize_session=False)
     db.commit()
     return {"app_id": app_id, "deleted_count": count, "dry_run": False}
 
@@ -73,108 +81,288 @@ def delete_reviews_by_game(
 # Cursor endpoints removed: cursor persistence is no longer used by the scraper.
 
 
+# Export all fields present in the Review model as (column, kind). The kind
+# selects how a value becomes a cell:
+#   raw  - value as-is            str  - value or ""
+#   opt  - "" when None           dt   - isoformat(), "" when None
+#   bool - "True"/"False" ("" when None)
+EXPORT_COLUMNS = [
+    ("review_id", "raw"),
+    ("app_id", "raw"),
+    ("review_date", "dt"),
+    ("review_text", "str"),
+    ("review_type", "str"),
+    ("language", "str"),
+    ("playtime_hours", "opt"),
+    ("early_access", "bool"),
+    ("received_for_free", "bool"),
+    ("timestamp_updated", "dt"),
+    ("votes_helpful", "opt"),
+    ("weighted_vote_score", "opt"),
+    ("comment_count", "opt"),
+    ("author_num_games_owned", "opt"),
+    ("author_num_reviews", "opt"),
+    ("author_playtime_last_two_weeks", "opt"),
+    ("author_last_played", "dt"),
+    ("steam_purchase", "bool"),
+    ("scraped_at", "dt"),
+]
+EXPORT_HEADERS = [name for name, _ in EXPORT_COLUMNS]
+
+_BOOL_STR = {True: "True", False: "False", None: ""}
+
+_CELL_TEMPLATES = {
+    "raw": "r.{col}",
+    "str": "r.{col} or ''",
+    "opt": "'' if (v{i} := r.{col}) is None else v{i}",
+    "dt": "'' if (v{i} := r.{col}) is None else v{i}.isoformat()",
+    "bool": "_BOOL_STR[r.{col}]",
+}
+
+
+def _compile_row_formatter(columns):
+    """Generate a straight-line `format_row(r) -> tuple` for a fixed column spec.
+
+    The export loop runs once per review, so the per-column kind dispatch is
+    resolved here, once, instead of on every row.
+    """
+    cells = "".join(
+        f"        ({_CELL_TEMPLATES[kind].format(col=col, i=i)}),\n"
+        for i, (col, kind) in enumerate(columns)
+    )
+    src = f"def format_row(r):\n    return (\n{cells}    )\n"
+    ns: Dict[str, Any] = {"_BOOL_STR": _BOOL_STR}
+    exec(compile(src, "<review-export>", "exec"), ns)
+    return ns["format_row"]
+
+
+_format_export_row = _compile_row_formatter(EXPORT_COLUMNS)
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv", "xlsx": XLSX_MEDIA_TYPE}
+
+
+def _export_rows(db: Session, app_id: int):
+    return (
+        db.query(models.Review)
+        .filter(models.Review.app_id == app_id)
+        .order_by(models.Review.review_date.asc())
+        .yield_per(1000)
+    )
+
+
+def _write_csv(fh, rows) -> None:
+    writer = csv.writer(fh)
+    writer.writerow(EXPORT_HEADERS)
+    writer.writerows(_format_export_row(r) for r in rows)
+
+
+def _build_xlsx(cells: List[tuple]) -> bytes:
+    """Render already-formatted export rows to XLSX bytes.
+
+    Top-level and fed plain tuples so it can run in `_xlsx_pool` worker
+    processes; openpyxl is pure-Python and would otherwise hold the GIL.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.append(EXPORT_HEADERS)
+    for row in cells:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+_xlsx_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_xlsx_pool() -> ProcessPoolExecutor:
+    # Created on first XLSX export so importing the router never spawns workers
+    global _xlsx_pool
+    if _xlsx_pool is None:
+        _xlsx_pool = ProcessPoolExecutor(max_workers=2)
+    return _xlsx_pool
+
+
+def shutdown_xlsx_pool() -> None:
+    # Registered as an app shutdown handler so worker processes don't outlive the server
+    global _xlsx_pool
+    if _xlsx_pool is not None:
+        _xlsx_pool.shutdown(wait=True, cancel_futures=True)
+        _xlsx_pool = None
+
+
+def _export_cells(db: Session, app_id: int) -> List[tuple]:
+    return [_format_export_row(r) for r in _export_rows(db, app_id)]
+
+
+def _render_csv(db: Session, app_id: int) -> bytes:
+    output = io.StringIO()
+    _write_csv(output, _export_rows(db, app_id))
+    data = output.getvalue().encode("utf-8")
+    output.close()
+    return data
+
+
+def _ensure_exportable(db: Session, app_id: int, format: str) -> None:
+    # Cheap index probe for the empty case before running the full ordered scan
+    if not db.query(exists().where(models.Review.app_id == app_id)).scalar():
+        raise HTTPException(status_code=404, detail="No reviews found for given app_id")
+    if format == "xlsx" and Workbook is None:
+        raise HTTPException(status_code=500, detail="XLSX export not available: missing openpyxl dependency")
+
+
 @router.get("/export/{app_id}")
-def export_reviews(app_id: int, format: str = Query("csv", regex="^(csv|xlsx)$"), db: Session = Depends(get_db)):
+async def export_reviews(app_id: int, format: str = Query("csv", regex="^(csv|xlsx)$"), db: Session = Depends(get_db)):
     """Export all reviews for an `app_id` as CSV or XLSX. Returns a file download.
 
     Query params:
     - format: `csv` or `xlsx` (default: csv)
     """
-    q = db.query(models.Review).filter(models.Review.app_id == app_id).order_by(models.Review.review_date.asc())
-    rows = q.all()
-
-    if not rows:
-        raise HTTPException(status_code=404, detail="No reviews found for given app_id")
-
-    # Export all fields present in the Review model
-    headers = [
-        "review_id",
-        "app_id",
-        "review_date",
-        "review_text",
-        "review_type",
-        "language",
-        "playtime_hours",
-        "early_access",
-        "received_for_free",
-        "timestamp_updated",
-        "votes_helpful",
-        "weighted_vote_score",
-        "comment_count",
-        "author_num_games_owned",
-        "author_num_reviews",
-        "author_playtime_last_two_weeks",
-        "author_last_played",
-        "steam_purchase",
-        "scraped_at",
-    ]
+    # DB work runs in the threadpool; XLSX rendering is CPU-bound and goes to
+    # a worker process so it doesn't tie up threads serving other requests.
+    await run_in_threadpool(_ensure_exportable, db, app_id, format)
 
     if format == "csv":
-        # Build CSV in-memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        for r in rows:
-            writer.writerow([
-                r.review_id,
-                r.app_id,
-                r.review_date.isoformat() if r.review_date is not None else "",
-                (r.review_text or ""),
-                r.review_type or "",
-                r.language or "",
-                r.playtime_hours if r.playtime_hours is not None else "",
-                str(bool(r.early_access)),
-                str(bool(r.received_for_free)),
-                r.timestamp_updated.isoformat() if getattr(r, 'timestamp_updated', None) is not None else "",
-                r.votes_helpful if getattr(r, 'votes_helpful', None) is not None else "",
-                r.weighted_vote_score if getattr(r, 'weighted_vote_score', None) is not None else "",
-                r.comment_count if getattr(r, 'comment_count', None) is not None else "",
-                r.author_num_games_owned if getattr(r, 'author_num_games_owned', None) is not None else "",
-                r.author_num_reviews if getattr(r, 'author_num_reviews', None) is not None else "",
-                r.author_playtime_last_two_weeks if getattr(r, 'author_playtime_last_two_weeks', None) is not None else "",
-                r.author_last_played.isoformat() if getattr(r, 'author_last_played', None) is not None else "",
-                str(bool(r.steam_purchase)) if getattr(r, 'steam_purchase', None) is not None else "",
-                r.scraped_at.isoformat() if r.scraped_at is not None else "",
-            ])
-        data = output.getvalue().encode("utf-8")
-        output.close()
+        data = await run_in_threadpool(_render_csv, db, app_id)
         filename = f"reviews_{app_id}.csv"
         return StreamingResponse(io.BytesIO(data), media_type="text/csv", headers={"Content-Disposition": f"attachment; filename=\"{filename}\""})
 
     # XLSX export
     if format == "xlsx":
-        if Workbook is None:
-            raise HTTPException(status_code=500, detail="XLSX export not available: missing openpyxl dependency")
-        wb = Workbook()
-        ws = wb.active
-        ws.append(headers)
-        for r in rows:
-            ws.append([
-                r.review_id,
-                r.app_id,
-                r.review_date.isoformat() if r.review_date is not None else "",
-                (r.review_text or ""),
-                r.review_type or "",
-                r.language or "",
-                r.playtime_hours if r.playtime_hours is not None else "",
-                str(bool(r.early_access)),
-                str(bool(r.received_for_free)),
-                r.timestamp_updated.isoformat() if getattr(r, 'timestamp_updated', None) is not None else "",
-                r.votes_helpful if getattr(r, 'votes_helpful', None) is not None else "",
-                r.weighted_vote_score if getattr(r, 'weighted_vote_score', None) is not None else "",
-                r.comment_count if getattr(r, 'comment_count', None) is not None else "",
-                r.author_num_games_owned if getattr(r, 'author_num_games_owned', None) is not None else "",
-                r.author_num_reviews if getattr(r, 'author_num_reviews', None) is not None else "",
-                r.author_playtime_last_two_weeks if getattr(r, 'author_playtime_last_two_weeks', None) is not None else "",
-                r.author_last_played.isoformat() if getattr(r, 'author_last_played', None) is not None else "",
-                str(bool(r.steam_purchase)) if getattr(r, 'steam_purchase', None) is not None else "",
-                r.scraped_at.isoformat() if r.scraped_at is not None else "",
-            ])
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
+        cells = await run_in_threadpool(_export_cells, db, app_id)
+        data = await asyncio.get_running_loop().run_in_executor(_get_xlsx_pool(), _build_xlsx, cells)
         filename = f"reviews_{app_id}.xlsx"
-        return StreamingResponse(buf, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers={"Content-Disposition": f"attachment; filename=\"{filename}\""})
+        return StreamingResponse(io.BytesIO(data), media_type=XLSX_MEDIA_TYPE, headers={"Content-Disposition": f"attachment; filename=\"{filename}\""})
+
+
+# In-memory registry of background export jobs: job_id -> status dict.
+# Large exports are built to a file under EXPORTS_DIR so the request that
+# starts them returns immediately and the download is served from disk.
+_export_jobs: Dict[str, Dict[str, Any]] = {}
+# The sync routes and the build tasks run on different threadpool threads;
+# every read or write of _export_jobs (and of a job's fields) holds this lock
+_export_jobs_lock = threading.Lock()
+
+# Finished jobs (and their files) are dropped once they are older than the
+# TTL, and the oldest go first when more than _MAX_FINISHED_EXPORTS remain.
+EXPORT_JOB_TTL_SECONDS = 60 * 60
+_MAX_FINISHED_EXPORTS = 20
+# Bookkeeping fields not reported by the status endpoint
+_EXPORT_JOB_PRIVATE_FIELDS = ("path", "finished_at")
+
+
+def _prune_export_jobs() -> None:
+    cutoff = time.monotonic() - EXPORT_JOB_TTL_SECONDS
+    with _export_jobs_lock:
+        finished = sorted(
+            (job["finished_at"], job_id)
+            for job_id, job in list(_export_jobs.items())
+            if job["finished_at"] is not None
+        )
+        excess = len(finished) - _MAX_FINISHED_EXPORTS
+        expired = [
+            _export_jobs.pop(job_id)
+            for i, (finished_at, job_id) in enumerate(finished)
+            if finished_at < cutoff or i < excess
+        ]
+    # Files are removed outside the lock; the jobs are already unreachable
+    for job in expired:
+        if job["path"]:
+            Path(job["path"]).unlink(missing_ok=True)
+
+
+@router.post("/export/{app_id}", status_code=202)
+def start_export(
+    app_id: int,
+    background_tasks: BackgroundTasks,
+    format: str = Query("csv", regex="^(csv|xlsx)$"),
+    db: Session = Depends(get_db),
+):
+    """Start building an export for `app_id` in the background.
+
+    Poll `/reviews/export/status/{job_id}` and fetch the file from
+    `/reviews/export/download/{job_id}` once its status is `done`.
+    """
+    _ensure_exportable(db, app_id, format)
+    _prune_export_jobs()
+    job_id = uuid.uuid4().hex
+    with _export_jobs_lock:
+        _export_jobs[job_id] = {
+            "job_id": job_id,
+            "app_id": app_id,
+            "format": format,
+            "status": "pending",
+            "error": None,
+            "path": None,
+            "finished_at": None,
+        }
+    background_tasks.add_task(_build_export, job_id)
+    return {
+        "job_id": job_id,
+        "status_url": f"/reviews/export/status/{job_id}",
+        "download_url": f"/reviews/export/download/{job_id}",
+    }
+
+
+def _build_export(job_id: str) -> None:
+    with _export_jobs_lock:
+        job = _export_jobs[job_id]
+        job["status"] = "running"
+        app_id, format = job["app_id"], job["format"]
+    db = SessionLocal()
+    path: Optional[Path] = None
+    result: Dict[str, Any] = {}
+    try:
+        out_dir = Path(settings.EXPORTS_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{job_id}.{format}"
+        if format == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as fh:
+                _write_csv(fh, _export_rows(db, app_id))
+        else:
+            # Already off the event loop in a background task thread, so
+            # render here rather than parking this thread on the pool
+            data = _build_xlsx(_export_cells(db, app_id))
+            with open(path, "wb") as fh:
+                fh.write(data)
+        result = {"path": str(path), "status": "done"}
+    except Exception as e:
+        # Don't leave a half-written file behind in EXPORTS_DIR
+        if path is not None:
+            path.unlink(missing_ok=True)
+        result = {"status": "failed", "error": str(e)}
+    finally:
+        db.close()
+        with _export_jobs_lock:
+            job.update(result, finished_at=time.monotonic())
+
+
+@router.get("/export/status/{job_id}")
+def export_status(job_id: str):
+    with _export_jobs_lock:
+        job = _export_jobs.get(job_id)
+        job = dict(job) if job else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return {k: v for k, v in job.items() if k not in _EXPORT_JOB_PRIVATE_FIELDS}
+
+
+@router.get("/export/download/{job_id}")
+def export_download(job_id: str):
+    with _export_jobs_lock:
+        job = _export_jobs.get(job_id)
+        job = dict(job) if job else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    return FileResponse(
+        job["path"],
+        media_type=_EXPORT_MEDIA_TYPES[job["format"]],
+        filename=f"reviews_{job['app_id']}.{job['format']}",
+    )
 
 
 @router.get("/count/{app_id}")
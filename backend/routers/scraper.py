@@ -37,7 +37,7 @@ async def status_scraper():
 			"total": p.global_total,
 			"eta_seconds": p.eta_seconds_global(),
 		},
-		"logs": p.logs,
+		"logs": list(p.logs),
 	}
 
 
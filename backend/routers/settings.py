@@ -1,38 +1,58 @@
-from typing import Any
+import json
+import time
+from typing import Any, Dict, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 
+try:
+    import orjson
+except Exception:
+    orjson = None  # orjson is optional; fall back to the stdlib JSON encoder
+
 from ..database import get_db
 from .. import crud
 from ..crypto import encrypt_key, decrypt_key
 from ..schemas import ApiKeyCreate, ApiKeyRead
-from typing import Any
-from fastapi import Body
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
+# Parsed JSON settings keyed by setting name -> (loaded_at, value). These
+# values change rarely and only through this router, so writes invalidate
+# their entry and reads are served from memory for a short TTL.
+_SETTINGS_TTL_SECONDS = 30.0
+_settings_cache: Dict[str, Tuple[float, Any]] = {}
 
-@router.get("/scraper")
-def get_scraper_settings(db: Session = Depends(get_db)) -> Any:
-    s = crud.get_setting(db, "scraper:settings")
+
+def _load_setting_json(db: Session, key: str) -> Any:
+    now = time.monotonic()
+    hit = _settings_cache.get(key)
+    if hit is not None and now - hit[0] < _SETTINGS_TTL_SECONDS:
+        return hit[1]
+    s = crud.get_setting(db, key)
     if not s:
-        return {}
-    try:
-        import json
+        value: Any = {}
+    else:
+        try:
+            value = json.loads(s.value)
+        except Exception:
+            raise HTTPException(status_code=500, detail="Unable to load settings. The configuration file may be corrupted or inaccessible.")
+    _settings_cache[key] = (now, value)
+    return value
 
-        return json.loads(s.value)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Unable to load settings. The configuration file may be corrupted or inaccessible.")
+
+@router.get("/scraper")
+def get_scraper_settings(db: Session = Depends(get_db)) -> Any:
+    return _load_setting_json(db, "scraper:settings")
 
 
 @router.post("/scraper")
 def post_scraper_settings(payload: Any = Body(...), db: Session = Depends(get_db)) -> Any:
     try:
-        import json
-
         raw = json.dumps(payload)
         s = crud.upsert_setting(db, "scraper:settings", raw)
+        _settings_cache.pop("scraper:settings", None)
         return {"ok": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -41,29 +61,21 @@ def post_scraper_settings(payload: Any = Body(...), db: Session = Depends(get_db
 @router.delete("/scraper")
 def delete_scraper_settings(db: Session = Depends(get_db)) -> Any:
     ok = crud.delete_setting(db, "scraper:settings")
+    _settings_cache.pop("scraper:settings", None)
     return {"ok": ok}
 
 
 @router.get("/analysis")
 def get_analysis_settings(db: Session = Depends(get_db)) -> Any:
-    s = crud.get_setting(db, "analysis:settings")
-    if not s:
-        return {}
-    try:
-        import json
-
-        return json.loads(s.value)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Unable to load settings. The configuration file may be corrupted or inaccessible.")
+    return _load_setting_json(db, "analysis:settings")
 
 
 @router.post("/analysis")
 def post_analysis_settings(payload: Any = Body(...), db: Session = Depends(get_db)) -> Any:
     try:
-        import json
-
         raw = json.dumps(payload)
         s = crud.upsert_setting(db, "analysis:settings", raw)
+        _settings_cache.pop("analysis:settings", None)
         return {"ok": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -72,48 +84,59 @@ def post_analysis_settings(payload: Any = Body(...), db: Session = Depends(get_d
 @router.delete("/analysis")
 def delete_analysis_settings(db: Session = Depends(get_db)) -> Any:
     ok = crud.delete_setting(db, "analysis:settings")
+    _settings_cache.pop("analysis:settings", None)
     return {"ok": ok}
 
 
 @router.get("/llm-config")
 def get_llm_config(db: Session = Depends(get_db)) -> Any:
-    s = crud.get_setting(db, "llm:config")
-    if not s:
-        return {}
-    try:
-        import json
-
-        return json.loads(s.value)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Unable to load settings. The configuration file may be corrupted or inaccessible.")
+    return _load_setting_json(db, "llm:config")
 
 
 @router.post("/llm-config")
 def post_llm_config(payload: Any = Body(...), db: Session = Depends(get_db)) -> Any:
     try:
-        import json
-
         raw = json.dumps(payload)
         s = crud.upsert_setting(db, "llm:config", raw)
+        _settings_cache.pop("llm:config", None)
         return {"ok": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Provider -> (key format check, error detail) used when storing or rotating keys
+_KEY_RULES = {
+    "openai": (
+        lambda raw: raw.startswith(("sk-", "oai-")) or len(raw) > 30,
+        "Incorrect OpenAI API key format. Please provide a valid OpenAI API key starting with 'sk-' or 'oai-'",
+    ),
+    "openrouter": (
+        lambda raw: raw.startswith("sk-or-"),
+        "Incorrect OpenRouter API key format. Please provide a valid OpenRouter API key starting with 'sk-or-'",
+    ),
+    "anthropic": (
+        lambda raw: raw.startswith("sk-ant-"),
+        "Incorrect Anthropic API key format. Please provide a valid Anthropic API key starting with 'sk-ant-'",
+    ),
+    "google": (
+        lambda raw: raw.startswith("AIza"),
+        "Incorrect Google API key format. Please provide a valid Google API key starting with 'AIza'",
+    ),
+}
+
+
+def _validate_key_format(provider: Any, raw: str) -> None:
+    rule = _KEY_RULES.get(str(provider or "").lower())
+    if rule and not rule[0](raw):
+        raise HTTPException(status_code=400, detail=rule[1])
+
+
 @router.post("/api-keys", response_model=ApiKeyRead)
 def create_api_key(payload: ApiKeyCreate = Body(...), db: Session = Depends(get_db)) -> Any:
     try:
         # Basic provider-specific key format validation
-        prov = str(payload.provider or "").lower()
         raw = payload.encrypted_key or ""
-        if prov == 'openai' and not (raw.startswith('sk-') or raw.startswith('oai-') or len(raw) > 30):
-            raise HTTPException(status_code=400, detail="Incorrect OpenAI API key format. Please provide a valid OpenAI API key starting with 'sk-' or 'oai-'")
-        if prov == 'openrouter' and not raw.startswith('sk-or-'):
-            raise HTTPException(status_code=400, detail="Incorrect OpenRouter API key format. Please provide a valid OpenRouter API key starting with 'sk-or-'")
-        if prov == 'anthropic' and not raw.startswith('sk-ant-'):
-            raise HTTPException(status_code=400, detail="Incorrect Anthropic API key format. Please provide a valid Anthropic API key starting with 'sk-ant-'")
-        if prov == 'google' and not raw.startswith('AIza'):
-            raise HTTPException(status_code=400, detail="Incorrect Google API key format. Please provide a valid Google API key starting with 'AIza'")
+        _validate_key_format(payload.provider, raw)
 
         enc = encrypt_key(raw)
         k = crud.create_api_key(db, payload.provider, enc, payload.name, payload.notes)
@@ -125,11 +148,22 @@ def create_api_key(payload: ApiKeyCreate = Body(...), db: Session = Depends(get_
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/api-keys")
+@router.get("/api-keys", response_class=ORJSONResponse if orjson is not None else JSONResponse)
 def list_api_keys(db: Session = Depends(get_db)) -> Any:
-    keys = crud.list_api_keys(db)
-    # return non-sensitive metadata only
-    return [ApiKeyRead.from_orm(k) for k in keys]
+    # return non-sensitive metadata only; rows are serialized directly without
+    # per-row Pydantic validation
+    return [
+        {
+            "id": k.id,
+            "provider": k.provider,
+            "name": k.name,
+            "notes": k.notes,
+            "created_at": k.created_at.isoformat(),
+            "updated_at": k.updated_at.isoformat(),
+            "masked_key": k.masked_key,
+        }
+        for k in crud.list_api_key_metadata(db)
+    ]
 
 
 @router.get("/api-keys/{key_id}")
@@ -159,16 +193,8 @@ def update_api_key(key_id: int, payload: Any = Body(...), db: Session = Depends(
             if not prov:
                 existing = crud.get_api_key(db, key_id)
                 prov = getattr(existing, 'provider', None) if existing else None
-            p = str(prov or '').lower()
             raw = payload.get('encrypted_key') or ''
-            if p == 'openai' and not (raw.startswith('sk-') or raw.startswith('oai-') or len(raw) > 30):
-                raise HTTPException(status_code=400, detail="Incorrect OpenAI API key format. Please provide a valid OpenAI API key starting with 'sk-' or 'oai-'")
-            if p == 'openrouter' and not raw.startswith('sk-or-'):
-                raise HTTPException(status_code=400, detail="Incorrect OpenRouter API key format. Please provide a valid OpenRouter API key starting with 'sk-or-'")
-            if p == 'anthropic' and not raw.startswith('sk-ant-'):
-                raise HTTPException(status_code=400, detail="Incorrect Anthropic API key format. Please provide a valid Anthropic API key starting with 'sk-ant-'")
-            if p == 'google' and not raw.startswith('AIza'):
-                raise HTTPException(status_code=400, detail="Incorrect Google API key format. Please provide a valid Google API key starting with 'AIza'")
+            _validate_key_format(prov, raw)
 
             enc = encrypt_key(raw)
         k = crud.update_api_key(db, key_id, encrypted_key=enc, name=payload.get("name"), notes=payload.get("notes"), provider=payload.get("provider"))
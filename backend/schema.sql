@@ -25,6 +25,13 @@ CREATE VIRTUAL TABLE IF NOT EXISTS steam_apps_fts USING fts5(
     tokenize = 'unicode61'
 );
 
+-- Small key/value store for tool bookkeeping (e.g. the steam_apps fingerprint
+-- the FTS indexes were last built from)
+CREATE TABLE IF NOT EXISTS _meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
 
 
 -- Analysis job and results tables
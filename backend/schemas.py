@@ -140,9 +140,13 @@ class ApiKeyRead(ApiKeyBase):
 class GameSearchResponse(BaseModel):
     """Paginated container for game search results."""
     games: List[GameCreate]
+    # Exact for AppID lookups; for name searches a lower bound (see has_more)
     total: Optional[int] = None
     start: int
     count: int
+    # True when more matches exist past this page; `total` then only counts
+    # up to one past the page
+    has_more: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
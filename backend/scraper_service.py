@@ -1,27 +1,77 @@
 import asyncio
+import collections
+import functools
+import hashlib
+import json
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 import httpx
-from sqlalchemy import func
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .config import settings
 from .database import SessionLocal
-from . import models, crud
+from . import models, crud, http_clients
+
+try:
+	import orjson
+except Exception:
+	orjson = None  # optional; fall back to the stdlib json module
+
+
+# Review pages above this size are decoded on a worker thread
+_INLINE_PARSE_MAX_BYTES = 512 * 1024
+
+# Pages kept for conditional GETs (about 100 reviews each)
+_PAGE_CACHE_MAX_ENTRIES = 128
+
+# Transient failures (rate limiting, overloaded store) are retried with
+# exponential backoff instead of ending the game's scrape
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_FETCH_MAX_ATTEMPTS = 5
+_RETRY_BASE_SECONDS = 1.0
+
+# The user's rpm cap applies to any window of this length
+_RATE_WINDOW_SECONDS = 60.0
+
+
+def _decode_json(body: bytes) -> Any:
+	return orjson.loads(body) if orjson is not None else json.loads(body)
 
 
 def utc_from_unix(ts: int) -> datetime:
 	return datetime.fromtimestamp(ts, tz=timezone.utc)
 
 
+_UNIX_EPOCH = datetime(1970, 1, 1)
+
+
+def naive_utc_from_unix(ts: int) -> datetime:
+	# Naive UTC as stored in the DB, without building and stripping a tz-aware value
+	return _UNIX_EPOCH + timedelta(seconds=int(ts))
+
+
+@functools.lru_cache(maxsize=256)
 def parse_date(date_str: Optional[str], *, end_of_day: bool = False) -> Optional[datetime]:
 	if not date_str:
 		return None
-	base = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+	try:
+		# Zero-padded YYYY-MM-DD (what the date pickers send): fromisoformat
+		# skips strptime's format-string machinery
+		if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+			raise ValueError(date_str)
+		base = datetime.fromisoformat(date_str)
+	except ValueError:
+		base = datetime.strptime(date_str, "%Y-%m-%d")
+	base = base.replace(tzinfo=timezone.utc)
 	if end_of_day:
 		# inclusive end-of-day
 		return base + timedelta(days=1) - timedelta(microseconds=1)
@@ -45,15 +95,141 @@ class ScrapeSettings:
 	early_access: str = "include"  # include | exclude | only
 	received_for_free: str = "include"  # include | exclude | only
 
+	@functools.cached_property
+	def filter_key(self) -> Tuple[Any, ...]:
+		"""The settings that decide which stored reviews count as matches."""
+		return (
+			_naive(self.start_date),
+			_naive(self.end_date),
+			(self.language or "").lower(),
+			self.early_access,
+			self.received_for_free,
+			float(self.min_playtime) if self.min_playtime is not None else None,
+			float(self.max_playtime) if self.max_playtime is not None else None,
+		)
+
+	@functools.cached_property
+	def filter_hash(self) -> str:
+		"""Fingerprint of `filter_key`, stored with the cached scrape_state counters."""
+		key = [v.isoformat() if isinstance(v, datetime) else v for v in self.filter_key]
+		return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+
+
+def _naive(dt: Optional[datetime]) -> Optional[datetime]:
+	# DB datetimes are stored as naive UTC
+	if dt is not None and dt.tzinfo is not None:
+		return dt.replace(tzinfo=None)
+	return dt
+
+
+def _epoch(dt: Optional[datetime]) -> Optional[float]:
+	# Naive datetimes are UTC (DB convention)
+	if dt is None:
+		return None
+	if dt.tzinfo is None:
+		dt = dt.replace(tzinfo=timezone.utc)
+	return dt.timestamp()
+
+
+@functools.lru_cache(maxsize=64)
+def _settings_filters(key: Tuple[Any, ...]) -> Tuple[Any, ...]:
+	# Games in one run usually share the global filters, so the clauses are
+	# built once per distinct settings rather than once per game.
+	start, end, lang, early_access, received_for_free, min_pt, max_pt = key
+	filters: List[Any] = []
+	if start is not None:
+		filters.append(models.Review.review_date >= start)
+	if end is not None:
+		filters.append(models.Review.review_date <= end)
+	if lang:
+		# Stored languages are lowercased on insert, so a plain equality
+		# keeps the column usable by ix_reviews_app_lang_date_scrape
+		filters.append(models.Review.language == lang)
+	if early_access == "exclude":
+		filters.append(models.Review.early_access == False)
+	if early_access == "only":
+		filters.append(models.Review.early_access == True)
+	if received_for_free == "exclude":
+		filters.append(models.Review.received_for_free == False)
+	if received_for_free == "only":
+		filters.append(models.Review.received_for_free == True)
+	if min_pt is not None:
+		filters.append(models.Review.playtime_hours >= min_pt)
+	if max_pt is not None:
+		filters.append(models.Review.playtime_hours <= max_pt)
+	return tuple(filters)
+
+
+@functools.lru_cache(maxsize=64)
+def _existing_stats_stmt(key: Tuple[Any, ...]) -> Any:
+	"""`SELECT max(review_date), count(*)` over one game's stored matches for `key`.
+
+	The game is bound at execute time (`app_id`), so every game scraped with
+	the same settings reuses one statement object and its compiled SQL.
+	"""
+	return select(func.max(models.Review.review_date), func.count()).where(
+		models.Review.app_id == bindparam("app_id"), *_settings_filters(key)
+	)
+
+
+def _compile_review_filter(s: ScrapeSettings) -> Callable[[Dict[str, Any]], bool]:
+	"""Generate a straight-line `keep(r) -> bool` for one game's language/flag/playtime filters.
+
+	Steam is asked for the language already (see `_fetch_page`), but pages can
+	still carry reviews in other languages; those are rejected first.
+
+	Only the checks the settings enable are emitted, so the per-review save
+	loop doesn't re-test which filters are active on every row.
+	"""
+	conds: List[str] = []
+	lang = (s.language or "").lower()
+	if lang and lang != "all":
+		# Same fallback as the stored `language` column in _normalize_reviews
+		conds.append(f"(r.get('language') or {lang!r}).lower() == {lang!r}")
+	if s.early_access == "exclude":
+		conds.append("not r.get('written_during_early_access')")
+	elif s.early_access == "only":
+		conds.append("r.get('written_during_early_access')")
+	if s.received_for_free == "exclude":
+		conds.append("not r.get('received_for_free')")
+	elif s.received_for_free == "only":
+		conds.append("r.get('received_for_free')")
+	# Playtime bounds are bound as names in `ns` rather than pasted in as
+	# literals: repr() of inf/nan isn't valid Python source
+	ns: Dict[str, Any] = {}
+	if s.min_playtime is not None or s.max_playtime is not None:
+		pt = "(float((r.get('author') or {}).get('playtime_forever') or 0) / 60.0)"
+		lo = hi = ""
+		if s.min_playtime is not None:
+			ns["_min_playtime"] = float(s.min_playtime)
+			lo = "_min_playtime <= "
+		if s.max_playtime is not None:
+			ns["_max_playtime"] = float(s.max_playtime)
+			hi = " <= _max_playtime"
+		conds.append(f"{lo}{pt}{hi}")
+	body = " and ".join(f"({c})" for c in conds) or "True"
+	src = f"def keep(r):\n    return bool({body})\n"
+	exec(compile(src, "<review-filter>", "exec"), ns)
+	return ns["keep"]
+
+
+@dataclass
+class GameProgress:
+	"""Counters for one game being scraped."""
+	app_id: int
+	name: str
+	scraped: int = 0
+	total: int = 0
+	target: int = 0
 
 
 @dataclass
 class Progress:
 	is_running: bool = False
-	current_game: Optional[Dict[str, Any]] = None
-	current_game_scraped: int = 0
-	current_game_total: int = 0
-	current_game_target: int = 0
+	# Games being scraped right now, in start order. With parallel games each
+	# keeps its own counters; the `current_game*` views report the newest.
+	active_games: Dict[int, GameProgress] = field(default_factory=dict)
 	global_scraped: int = 0
 	global_total: int = 0
 	avg_request_seconds: float = 0.0
@@ -61,51 +237,109 @@ class Progress:
 	rate_limit_rpm: int = 60
 	# Timestamp when current run started (UTC)
 	start_time: Optional[datetime] = None
+	# time.monotonic() at start_time; used for elapsed time so clock jumps don't skew the ETA
+	start_monotonic: Optional[float] = None
 	# global_scraped value at start_time (so we can compute observed rate)
 	start_global_scraped: int = 0
 	requests_made: int = 0
-	logs: List[str] = field(default_factory=list)
+	# Store-derived review target per app_id, filled in as each game's first
+	# page arrives; games not reached yet count as default_game_target
+	per_game_estimates: Dict[int, int] = field(default_factory=dict)
+	games_total: int = 0
+	default_game_target: int = 0
+	# Most recent 100 lines; the deque drops the oldest on append
+	logs: Deque[str] = field(default_factory=lambda: collections.deque(maxlen=100))
 	stop_requested: bool = False
+	# Set after each page's reviews are saved, and when the run ends
+	page_saved: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+	finished: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+	# name -> (computed_at monotonic, counters snapshot, eta); the UI polls
+	# status several times a second while counters only move once per page
+	_eta_cache: Dict[str, Tuple[float, Tuple[int, ...], int]] = field(default_factory=dict, repr=False)
+
+	def _current(self) -> Optional[GameProgress]:
+		return next(reversed(self.active_games.values()), None)
+
+	@property
+	def current_game(self) -> Optional[Dict[str, Any]]:
+		game = self._current()
+		return {"app_id": game.app_id, "name": game.name} if game else None
+
+	@property
+	def current_game_scraped(self) -> int:
+		game = self._current()
+		return game.scraped if game else 0
+
+	@property
+	def current_game_total(self) -> int:
+		game = self._current()
+		return game.total if game else 0
+
+	@property
+	def current_game_target(self) -> int:
+		game = self._current()
+		return game.target if game else 0
 
 	def log(self, message: str) -> None:
-		self.logs.append(f"{datetime.now(timezone.utc).isoformat()} {message}")
-		if len(self.logs) > 100:
-			self.logs = self.logs[-100:]
+		self.logs.append(f"{datetime.now(timezone.utc).isoformat(timespec='seconds')} {message}")
+
+	def set_game_estimate(self, app_id: int, total: int) -> None:
+		self.per_game_estimates[app_id] = total
+		unseen = max(0, self.games_total - len(self.per_game_estimates))
+		self.global_total = sum(self.per_game_estimates.values()) + unseen * self.default_game_target
+
+	def _cached_eta(self, name: str, compute: Callable[[], int]) -> int:
+		now = time.monotonic()
+		snapshot = (self.global_scraped, self.current_game_scraped, self.current_game_total, self.global_total)
+		cached = self._eta_cache.get(name)
+		if cached is not None and now - cached[0] < 1.0 and cached[1] == snapshot:
+			return cached[2]
+		value = compute()
+		self._eta_cache[name] = (now, snapshot, value)
+		return value
 
 	def eta_seconds_current(self) -> int:
-		if self.current_game_total <= 0:
-			return 0
-		remaining_reviews = max(self.current_game_total - self.current_game_scraped, 0)
-		# Estimate reviews/sec using observed rate (saves since start) capped by
-		# the theoretical max given the rate limit and page size.
+		return self._cached_eta("current", self._eta_current)
+
+	def eta_seconds_global(self) -> int:
+		return self._cached_eta("global", self._eta_global)
+
+	def _expected_rate(self) -> float:
+		"""Expected reviews/sec, capped by the theoretical max for the rate limit and page size."""
 		theoretical_reviews_per_sec = (self.rate_limit_rpm * 100.0) / 60.0
+		# Model from measured latency: the limiter spaces sends 60/rpm apart but
+		# doesn't add to a slower response, so a page costs whichever is longer.
+		if self.avg_request_seconds > 0:
+			per_page = max(self.avg_request_seconds, 60.0 / max(self.rate_limit_rpm, 1))
+			modelled_rate = min(theoretical_reviews_per_sec, 100.0 / per_page)
+		else:
+			modelled_rate = theoretical_reviews_per_sec * 0.9
 		observed_rate = 0.0
-		if self.start_time is not None:
-			elapsed = (datetime.utcnow() - self.start_time).total_seconds()
+		if self.start_monotonic is not None:
+			elapsed = time.monotonic() - self.start_monotonic
 			if elapsed > 0:
 				observed = max(0, self.global_scraped - self.start_global_scraped)
 				observed_rate = observed / elapsed
-		# If we have an observed rate use it (but never exceed theoretical max),
-		# otherwise fall back to a conservative fraction of the theoretical max.
-		expected_rate = observed_rate if observed_rate > 0 else (theoretical_reviews_per_sec * 0.9)
-		expected_rate = min(expected_rate, theoretical_reviews_per_sec)
+		# Once saves are happening, blend in the observed rate (filters and
+		# duplicates mean fewer than 100 reviews are saved per page)
+		if observed_rate > 0:
+			return min(0.5 * observed_rate + 0.5 * modelled_rate, theoretical_reviews_per_sec)
+		return modelled_rate
+
+	def _eta_current(self) -> int:
+		if self.current_game_total <= 0:
+			return 0
+		remaining_reviews = max(self.current_game_total - self.current_game_scraped, 0)
+		expected_rate = self._expected_rate()
 		if expected_rate <= 0:
 			return 0
 		return int(remaining_reviews / expected_rate)
 
-	def eta_seconds_global(self) -> int:
+	def _eta_global(self) -> int:
 		if self.global_total <= 0:
 			return 0
 		remaining_reviews = max(self.global_total - self.global_scraped, 0)
-		theoretical_reviews_per_sec = (self.rate_limit_rpm * 100.0) / 60.0
-		observed_rate = 0.0
-		if self.start_time is not None:
-			elapsed = (datetime.utcnow() - self.start_time).total_seconds()
-			if elapsed > 0:
-				observed = max(0, self.global_scraped - self.start_global_scraped)
-				observed_rate = observed / elapsed
-		expected_rate = observed_rate if observed_rate > 0 else (theoretical_reviews_per_sec * 0.9)
-		expected_rate = min(expected_rate, theoretical_reviews_per_sec)
+		expected_rate = self._expected_rate()
 		if expected_rate <= 0:
 			return 0
 		return int(remaining_reviews / expected_rate)
@@ -116,6 +350,20 @@ class ScraperService:
 		self._lock = asyncio.Lock()
 		self._task: Optional[asyncio.Task] = None
 		self.progress = Progress()
+		# The app-wide pooled client (see http_clients), bound when a run
+		# starts so it belongs to the running event loop
+		self._client: Optional[httpx.AsyncClient] = None
+		# Send times of the most recent requests, shared by every game so
+		# concurrent scrapes stay within the rpm budget together. Kept across
+		# runs: a restart right after a run must not start with a fresh budget.
+		self._req_times: Deque[float] = collections.deque(maxlen=1)
+		self._rate_lock = asyncio.Lock()
+		# All review writes go through one worker thread: they stay off the
+		# event loop, and concurrent games never contend for the SQLite write lock.
+		self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="review-writer")
+		# (app_id, language, cursor) -> (etag, last_modified, body) for pages the
+		# store sent validators with; lets a re-run revalidate instead of re-download
+		self._page_cache: "collections.OrderedDict[Tuple[int, str, str], Tuple[Optional[str], Optional[str], bytes]]" = collections.OrderedDict()
 
 	async def start(self, settings_payload: Dict[str, Any]) -> None:
 		async with self._lock:
@@ -152,6 +400,7 @@ class ScraperService:
 
 	async def _run(self, settings_payload: Dict[str, Any]) -> None:
 		try:
+			self._client = http_clients.get_client()
 			global_settings = settings_payload.get("global_settings", {})
 			per_game_overrides: Dict[str, Dict[str, Any]] = settings_payload.get("per_game_overrides", {})
 
@@ -183,204 +432,169 @@ class ScraperService:
 			g_settings = make_settings(global_settings)
 			# Initialize run-level ETA baselines
 			self.progress.start_time = datetime.utcnow()
+			self.progress.start_monotonic = time.monotonic()
 			self.progress.start_global_scraped = 0
 			self.progress.rate_limit_rpm = g_settings.rate_limit_rpm
 
-			# Load active games
-			db: Session = SessionLocal()
-			try:
-				active_games = crud.list_games(db)
-			except Exception:
-				db.close()
-				raise
+			# Load active games; a single small read, done once per run before
+			# any page is requested
+			active_games = self._load_games()
 
 			# Initialize global total estimate. When doing complete scraping we
 			# don't have a per-game cap so initialize to 0 and accumulate when
 			# each game's store-provided total is known.
-			if g_settings.complete_scraping:
-				self.progress.global_total = 0
-			else:
-				self.progress.global_total = len(active_games) * (g_settings.max_reviews or 0)
+			self.progress.games_total = len(active_games)
+			self.progress.default_game_target = 0 if g_settings.complete_scraping else (g_settings.max_reviews or 0)
+			self.progress.global_total = self.progress.games_total * self.progress.default_game_target
 			self.progress.global_scraped = 0
 			self.progress.start_time = datetime.utcnow()
+			self.progress.start_monotonic = time.monotonic()
 			self.progress.start_global_scraped = self.progress.global_scraped
 
+			max_parallel = max(1, int(
+				settings_payload.get("max_parallel_games")
+				or global_settings.get("max_parallel_games")
+				or settings.SCRAPER_MAX_PARALLEL_GAMES
+			))
+			sem = asyncio.Semaphore(max_parallel)
+			tasks: List[asyncio.Task] = []
 			for game in active_games:
-				if self.progress.stop_requested:
-					break
-				settings_for_game = make_settings({**global_settings, **per_game_overrides.get(str(game.app_id), {})})
-				await self._scrape_game(game, settings_for_game)
+				# Games without overrides share the global settings object (and
+				# with it the memoized filter key/hash); only overrides are re-parsed
+				override = per_game_overrides.get(str(game.app_id))
+				settings_for_game = make_settings({**global_settings, **override}) if override else g_settings
+				tasks.append(asyncio.create_task(self._scrape_game_guarded(sem, game, settings_for_game)))
+			try:
+				await asyncio.gather(*tasks)
+			except BaseException:
+				for t in tasks:
+					t.cancel()
+				raise
 		finally:
+			# Shared client: closed by the app's shutdown hook, not per run
+			self._client = None
 			self.progress.is_running = False
-			self.progress.current_game = None
+			self.progress.active_games.clear()
 			self.progress.log("Scraper finished")
+			self.progress.finished.set()
 
-	async def _rate_limit_sleep(self, rpm: int) -> None:
-		# Minimal sleep to respect rpm; rpm is requests per minute
-		seconds = max(0.0, 60.0 / max(1, rpm))
-		await asyncio.sleep(seconds)
-
-	async def _scrape_game(self, game: models.Game, settings_for_game: ScrapeSettings) -> None:
-		self.progress.current_game = {"app_id": game.app_id, "name": game.name}
-		# Initialize current scraped count with existing DB matches so UI shows correct starting point
-		self.progress.current_game_scraped = 0
-		self.progress.current_game_total = 0
-		# Show the configured target for UI; for complete scraping this may be
-		# unknown until we learn the store's total for the game.
-		self.progress.current_game_target = settings_for_game.max_reviews or 0
+	async def _scrape_game_guarded(self, sem: asyncio.Semaphore, game: models.Game, settings_for_game: ScrapeSettings) -> None:
+		async with sem:
+			if self.progress.stop_requested:
+				return
+			# One session (and pooled connection) for the game's setup query and
+			# every page save, committed per page
+			# Show the configured target for UI; for complete scraping this may be
+			# unknown until we learn the store's total for the game.
+			game_progress = GameProgress(game.app_id, game.name, target=settings_for_game.max_reviews or 0)
+			self.progress.active_games[game.app_id] = game_progress
+			try:
+				with SessionLocal() as db:
+					await self._scrape_game(game, settings_for_game, db, game_progress)
+			finally:
+				self.progress.active_games.pop(game.app_id, None)
+
+	async def _wait_for_request_slot(self, rpm: int) -> None:
+		# Sliding window: at most `rpm` requests in any 60-second window. Only
+		# the wait for the oldest of the last `rpm` sends to leave the window
+		# is slept, so time Steam spent answering counts toward the budget
+		# instead of each request waiting out a fixed 60/rpm interval.
+		rpm = max(1, rpm)
+		async with self._rate_lock:
+			if self._req_times.maxlen < rpm:
+				self._req_times = collections.deque(self._req_times, maxlen=rpm)
+			if len(self._req_times) >= rpm:
+				wait = _RATE_WINDOW_SECONDS - (time.monotonic() - self._req_times[-rpm])
+				if wait > 0:
+					await asyncio.sleep(wait)
+			self._req_times.append(time.monotonic())
+
+	async def _scrape_game(
+		self, game: models.Game, settings_for_game: ScrapeSettings, db: Session, game_progress: GameProgress
+	) -> None:
 		self.progress.log(f"Starting scrape for {game.name} ({game.app_id})")
+		# Per-page lines name their game (several may be scraping at once); the
+		# prefix is built once rather than per page
+		log_prefix = f"[{game.name}/{game.app_id}] "
 
 		cursor = "*"
 		saved_count = 0
 		no_new_found = False
-		# Track duplicate/no-save pages when starting from newest
+		# Pages in a row made up only of reviews this run already handled;
+		# Steam cycling over the same reviews ends the game after this many
 		consecutive_no_save_pages = 0
-		DUPLICATE_PAGE_LIMIT = 3
-		client = httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT_SECONDS)
+		MAX_NO_SAVE_PAGES = 6
+		# Determine resume threshold and the number of reviews we already have.
+		# Both use the current filters so we don't prematurely stop when DB
+		# contains reviews that don't meet the current settings (e.g., playtime bounds).
+		# A scrape_state row recorded under the same filters already holds both
+		# values; otherwise count once and record them for the next run.
+		filter_hash = settings_for_game.filter_hash
+		latest, existing_db_count = await self._run_in_writer(self._resume_state, db, game.app_id, settings_for_game)
+
+		# Keep original configured start date for counting existing matches
+		configured_start = settings_for_game.start_date
+		threshold_start = configured_start
+		# Normalize for comparison (DB datetimes are naive UTC)
+		threshold_start_cmp = (
+			threshold_start.replace(tzinfo=None)
+			if (threshold_start is not None and threshold_start.tzinfo is not None)
+			else threshold_start
+		)
+		# Resume from newest in DB if it's newer than start_date.
+		# This ensures we only fetch reviews newer than what's stored unless a newer start_date is provided.
+		if latest:
+			if threshold_start_cmp is None or latest > threshold_start_cmp:
+				threshold_start = latest
+
+		# Add existing DB count to progress so UI logs/ETA start from current DB state
+		game_progress.scraped = existing_db_count
+		self.progress.global_scraped += existing_db_count
+		# If already have enough reviews, skip scraping
+		# Debug: log counts to help diagnose resume behavior
+		self.progress.log(
+			f"Resume check for {game.name}: latest_in_db={latest}, configured_start={configured_start}, existing_matches={existing_db_count}, requested_max={settings_for_game.max_reviews}"
+		)
+		# Additional debug to help understand complete_scraping behavior
+		self.progress.log(
+			f"Settings: complete_scraping={settings_for_game.complete_scraping}, rate_limit={settings_for_game.rate_limit_rpm}, language={settings_for_game.language}"
+		)
+		# If complete_scraping is requested, we don't cap by max_reviews and
+		# instead attempt to fetch all reviews (remaining_needed=None).
+		if settings_for_game.complete_scraping:
+			remaining_needed = None
+		else:
+			remaining_needed = max(0, (settings_for_game.max_reviews or 0) - existing_db_count)
+		if remaining_needed is not None and remaining_needed <= 0:
+			self.progress.log(f"No new reviews for '{game.name}' are avaliable. All reviews that meet the configuration settings have been gathered.")
+			return
+		# Log computed remaining_needed before scraping
+		self.progress.log(log_prefix + f"Computed remaining_needed={remaining_needed}")
+
+		# If user did not set a start_date and DB already has some reviews, allow
+		# scraping older pages by clearing the resume threshold. This must also
+		# apply when `complete_scraping` is requested (remaining_needed is None),
+		# so treat None as "more needed".
+		if configured_start is None and existing_db_count > 0 and (remaining_needed is None or remaining_needed > 0):
+			threshold_start = None
+
+		keep = _compile_review_filter(settings_for_game)
+		# Date bounds as epoch seconds, fixed for the whole scrape and compared
+		# against the raw payload values (no per-page datetime conversions)
+		threshold_ts = _epoch(threshold_start)
+		end_ts = _epoch(settings_for_game.end_date)
+		# Review IDs known to be in the DB; overlapping pages skip the lookup
+		seen_ids: Set[str] = set()
+		# Whether this game's share of the global estimate has been set
+		estimated = False
+		page_task = asyncio.create_task(self._fetch_page(game.app_id, cursor, settings_for_game))
 		try:
-			# Determine resume threshold. Query the latest review that matches the
-			# current filters so we don't prematurely stop when DB contains reviews
-			# that don't meet the current settings (e.g., playtime bounds).
-			db: Session = SessionLocal()
-			try:
-				q_latest = db.query(func.max(models.Review.review_date)).filter(models.Review.app_id == game.app_id)
-				# apply same filters used below when counting existing matches
-				if settings_for_game.start_date is not None:
-					cs = settings_for_game.start_date.replace(tzinfo=None) if settings_for_game.start_date.tzinfo is not None else settings_for_game.start_date
-					q_latest = q_latest.filter(models.Review.review_date >= cs)
-				end_date_cmp_tmp: Optional[datetime] = settings_for_game.end_date
-				if end_date_cmp_tmp and end_date_cmp_tmp.tzinfo is not None:
-					end_date_cmp_tmp = end_date_cmp_tmp.replace(tzinfo=None)
-				if end_date_cmp_tmp is not None:
-					q_latest = q_latest.filter(models.Review.review_date <= end_date_cmp_tmp)
-				lang_tmp = (settings_for_game.language or "").lower()
-				if lang_tmp:
-					q_latest = q_latest.filter(func.lower(models.Review.language) == lang_tmp)
-				if settings_for_game.early_access == "exclude":
-					q_latest = q_latest.filter(models.Review.early_access == False)
-				if settings_for_game.early_access == "only":
-					q_latest = q_latest.filter(models.Review.early_access == True)
-				if settings_for_game.received_for_free == "exclude":
-					q_latest = q_latest.filter(models.Review.received_for_free == False)
-				if settings_for_game.received_for_free == "only":
-					q_latest = q_latest.filter(models.Review.received_for_free == True)
-				if settings_for_game.min_playtime is not None:
-					q_latest = q_latest.filter(models.Review.playtime_hours >= float(settings_for_game.min_playtime))
-				if settings_for_game.max_playtime is not None:
-					q_latest = q_latest.filter(models.Review.playtime_hours <= float(settings_for_game.max_playtime))
-				latest: Optional[datetime] = q_latest.scalar()
-			finally:
-				db.close()
-
-			# Keep original configured start date for counting existing matches
-			configured_start = settings_for_game.start_date
-			threshold_start = configured_start
-			# Normalize for comparison (DB datetimes are naive UTC)
-			threshold_start_cmp = (
-				threshold_start.replace(tzinfo=None)
-				if (threshold_start is not None and threshold_start.tzinfo is not None)
-				else threshold_start
-			)
-			# Resume from newest in DB if it's newer than start_date.
-			# This ensures we only fetch reviews newer than what's stored unless a newer start_date is provided.
-			if latest:
-				if threshold_start_cmp is None or latest > threshold_start_cmp:
-					threshold_start = latest
-
-			# Count existing reviews in DB that already meet the filters so we only fetch the remainder
-			existing_db_count = 0
-			db2: Session = SessionLocal()
-			try:
-				q = db2.query(func.count()).filter(models.Review.app_id == game.app_id)
-				# apply filters based on the configured settings (not the resume threshold)
-				if configured_start is not None:
-					cs = configured_start.replace(tzinfo=None) if configured_start.tzinfo is not None else configured_start
-					q = q.filter(models.Review.review_date >= cs)
-				end_date_cmp: Optional[datetime] = settings_for_game.end_date
-				if end_date_cmp and end_date_cmp.tzinfo is not None:
-					end_date_cmp = end_date_cmp.replace(tzinfo=None)
-				if end_date_cmp is not None:
-					q = q.filter(models.Review.review_date <= end_date_cmp)
-				# language filter
-				lang = (settings_for_game.language or "").lower()
-				if lang:
-					q = q.filter(func.lower(models.Review.language) == lang)
-				if settings_for_game.early_access == "exclude":
-					q = q.filter(models.Review.early_access == False)
-				if settings_for_game.early_access == "only":
-					q = q.filter(models.Review.early_access == True)
-				if settings_for_game.received_for_free == "exclude":
-					q = q.filter(models.Review.received_for_free == False)
-				if settings_for_game.received_for_free == "only":
-					q = q.filter(models.Review.received_for_free == True)
-				# Playtime filters (hours) - ensure existing DB count respects min/max playtime
-				min_pt = settings_for_game.min_playtime
-				max_pt = settings_for_game.max_playtime
-				if min_pt is not None:
-					q = q.filter(models.Review.playtime_hours >= float(min_pt))
-				if max_pt is not None:
-					q = q.filter(models.Review.playtime_hours <= float(max_pt))
-				existing_db_count = int(q.scalar() or 0)
-			finally:
-				db2.close()
-
-			# Add existing DB count to progress so UI logs/ETA start from current DB state
-			self.progress.current_game_scraped = existing_db_count
-			self.progress.global_scraped += existing_db_count
-			# If already have enough reviews, skip scraping
-			# Debug: log counts to help diagnose resume behavior
-			self.progress.log(
-				f"Resume check for {game.name}: latest_in_db={latest}, configured_start={configured_start}, existing_matches={existing_db_count}, requested_max={settings_for_game.max_reviews}"
-			)
-			# Additional debug to help understand complete_scraping behavior
-			self.progress.log(
-				f"Settings: complete_scraping={settings_for_game.complete_scraping}, rate_limit={settings_for_game.rate_limit_rpm}, language={settings_for_game.language}"
-			)
-			# If complete_scraping is requested, we don't cap by max_reviews and
-			# instead attempt to fetch all reviews (remaining_needed=None).
-			if settings_for_game.complete_scraping:
-				remaining_needed = None
-			else:
-				remaining_needed = max(0, (settings_for_game.max_reviews or 0) - existing_db_count)
-			if remaining_needed is not None and remaining_needed <= 0:
-				self.progress.log(f"No new reviews for '{game.name}' are avaliable. All reviews that meet the configuration settings have been gathered.")
-				return
-			# Log computed remaining_needed before scraping
-			self.progress.log(f"Computed remaining_needed={remaining_needed}")
-
-			# If user did not set a start_date and DB already has some reviews, allow
-			# scraping older pages by clearing the resume threshold. This must also
-			# apply when `complete_scraping` is requested (remaining_needed is None),
-			# so treat None as "more needed".
-			if configured_start is None and existing_db_count > 0 and (remaining_needed is None or remaining_needed > 0):
-				threshold_start = None
-
 			while True:
-				params = {
-					"json": 1,
-					"filter": "recent",
-					"language": settings_for_game.language,
-					"num_per_page": 100,
-					"cursor": cursor,
-				}
-				url = f"https://store.steampowered.com/appreviews/{game.app_id}"
-				start_req = time.perf_counter()
-				resp = await client.get(url, params=params)
-				elapsed = time.perf_counter() - start_req
-				# Update average request time
-				self.progress.requests_made += 1
-				if self.progress.avg_request_seconds <= 0:
-					self.progress.avg_request_seconds = elapsed
-				else:
-					self.progress.avg_request_seconds = (
-						self.progress.avg_request_seconds * (self.progress.requests_made - 1) + elapsed
-					) / self.progress.requests_made
-
-				resp.raise_for_status()
-				payload = resp.json()
+				payload = await page_task
 				reviews = payload.get("reviews", []) or []
 				qsum = payload.get("query_summary", {}) or {}
-				if self.progress.current_game_total == 0:
+				if not estimated:
+					estimated = True
 					# Steam provides a rough total of available reviews (qsum). For UI progress
 					# and ETA we prefer to use the user-requested target (`max_reviews`) so the
 					# progress bar and ETA reflect the configured goal rather than the full
@@ -390,35 +604,27 @@ class ScraperService:
 					if q_total > 0:
 						if settings_for_game.complete_scraping:
 							# When doing complete scraping, prefer the store's total
-							self.progress.current_game_total = q_total
+							game_progress.total = q_total
 						else:
-							self.progress.current_game_total = min(q_total, settings_for_game.max_reviews or 0)
+							game_progress.total = min(q_total, settings_for_game.max_reviews or 0)
 					else:
 						# Fallback to requested max (or 0) if store doesn't provide an estimate
-						self.progress.current_game_total = settings_for_game.max_reviews or 0
-					# Adjust global total. If global_total was initialized to 0
-					# (complete mode) just accumulate; otherwise replace the
-					# per-game rough estimate with the chosen estimate.
-					if self.progress.global_total <= 0:
-						self.progress.global_total += self.progress.current_game_total
-					else:
-						self.progress.global_total -= (settings_for_game.max_reviews or 0)
-						self.progress.global_total += self.progress.current_game_total
+						game_progress.total = settings_for_game.max_reviews or 0
+					# Replace this game's share of the global estimate with the chosen total
+					self.progress.set_game_estimate(game.app_id, game_progress.total)
 					# If we're doing complete scraping, update the UI target to the store total
 					if settings_for_game.complete_scraping:
-						self.progress.current_game_target = self.progress.current_game_total
+						game_progress.target = game_progress.total
+
+				# One pass over the page: newest timestamp plus the reviews that
+				# pass the date, flag and playtime filters, reduced to plain column values
+				batch_max_ts, candidates = _normalize_reviews(
+					game.app_id, reviews, keep, settings_for_game.language, threshold_ts, end_ts
+				)
 
 				# If all returned reviews are older than our threshold (i.e. nothing new), stop
 				if reviews:
-					# compute max timestamp in batch
-					batch_max_ts = max((int(r.get("timestamp_created") or 0) for r in reviews), default=0)
-					batch_max_dt = utc_from_unix(batch_max_ts).replace(tzinfo=None)
-					threshold_cmp = (
-						threshold_start.replace(tzinfo=None)
-						if (threshold_start is not None and threshold_start.tzinfo is not None)
-						else threshold_start
-					)
-					if threshold_cmp is not None and batch_max_dt <= threshold_cmp:
+					if threshold_ts is not None and batch_max_ts <= threshold_ts:
 						# Friendly log explaining why we are stopping early
 						self.progress.log(
 							f"No new reviews for '{game.name}' are avaliable. All reviews that meet the configuration settings have been gathered."
@@ -426,153 +632,386 @@ class ScraperService:
 						no_new_found = True
 						break
 
-				# Save batch (cap to remaining_needed)
-				saved_this_batch = await self._save_reviews(
-					game.app_id,
-					reviews,
-					settings_for_game,
-					threshold_start,
+				# Start fetching the next page while this one is being saved.
+				# Steam hands back the same cursor once a game is exhausted. When
+				# this page can already fill the cap, the next one is likely not
+				# needed, so it is only fetched if the save falls short.
+				next_cursor = payload.get("cursor") or cursor
+				exhausted = not reviews or next_cursor == cursor
+				prefetched = (
+					not exhausted
+					and not self.progress.stop_requested
+					and (remaining_needed is None or len(candidates) < remaining_needed)
+				)
+				if prefetched:
+					page_task = asyncio.create_task(self._fetch_page(game.app_id, next_cursor, settings_for_game))
+
+				repeated_page = bool(candidates) and all(row["review_id"] in seen_ids for _, row in candidates)
+				# Save batch (cap to remaining_needed) on the writer thread so the
+				# prefetch above can proceed
+				saved_this_batch = await self._run_in_writer(
+					self._save_reviews,
+					db,
+					candidates,
+					filter_hash,
+					seen_ids,
 					max_to_save=remaining_needed,
 				)
 				saved_count += saved_this_batch
-				self.progress.current_game_scraped += saved_this_batch
+				game_progress.scraped += saved_this_batch
 				self.progress.global_scraped += saved_this_batch
 				if remaining_needed is not None:
 					remaining_needed -= saved_this_batch
-				# Track duplicate/no-save pages when starting from newest; helps decide when to jump to saved cursor
-				if saved_this_batch == 0:
+				# Only repeats count: pages of reviews stored by earlier runs are
+				# expected while backfilling past them
+				if repeated_page and saved_this_batch == 0:
 					consecutive_no_save_pages += 1
 				else:
 					consecutive_no_save_pages = 0
-				# (cursor persistence removed)
 				self.progress.log(
-					f"Fetched {len(reviews)} reviews (saved {saved_this_batch}) "
-					f"({self.progress.current_game_scraped}/{self.progress.current_game_total} total)"
+					log_prefix + f"Fetched {len(reviews)} reviews (saved {saved_this_batch}) "
+					f"({game_progress.scraped}/{game_progress.total} total)"
 				)
+				self.progress.page_saved.set()
 
 				# Respect stop flag after finishing saving current batch
 				if self.progress.stop_requested:
-					self.progress.log("Stopping scrape after current request")
+					self.progress.log(log_prefix + "Stopping scrape after current request")
 					break
 
-				if not reviews:
+				if exhausted:
 					break
 				if remaining_needed is not None and remaining_needed <= 0:
 					break
+				if consecutive_no_save_pages >= MAX_NO_SAVE_PAGES:
+					self.progress.log(
+						log_prefix + f"No fresh reviews after {consecutive_no_save_pages} pages; ending game."
+					)
+					break
 
-				# Next cursor
-				cursor = payload.get("cursor") or cursor
-				# Respect rate limit
-				await self._rate_limit_sleep(settings_for_game.rate_limit_rpm)
-
-			if no_new_found:
-				# Final user-friendly message already logged above; summarize with saved count
-				self.progress.log(f"Finished: skipped scraping for {game.name} (no new reviews). Saved {saved_count} new reviews in this run.")
-			else:
-				self.progress.log(f"Scrape complete for {game.name} (saved {saved_count} new reviews)")
+				cursor = next_cursor
+				if not prefetched:
+					page_task = asyncio.create_task(self._fetch_page(game.app_id, cursor, settings_for_game))
 		finally:
-			await client.aclose()
-
-	async def _save_reviews(
+			# Drop a prefetched page we no longer need. Awaiting it retrieves
+			# its outcome, so a prefetch that already failed isn't reported
+			# as "Task exception was never retrieved".
+			page_task.cancel()
+			await asyncio.gather(page_task, return_exceptions=True)
+
+		if no_new_found:
+			# Final user-friendly message already logged above; summarize with saved count
+			self.progress.log(f"Finished: skipped scraping for {game.name} (no new reviews). Saved {saved_count} new reviews in this run.")
+		else:
+			self.progress.log(f"Scrape complete for {game.name} (saved {saved_count} new reviews)")
+
+	@staticmethod
+	def _load_games() -> List[models.Game]:
+		with SessionLocal() as db:
+			return crud.list_games(db)
+
+	def _resume_state(self, db: Session, app_id: int, settings_for_game: ScrapeSettings) -> Tuple[Optional[datetime], int]:
+		"""Newest stored review date and count of stored matches for the game's filters."""
+		filter_hash = settings_for_game.filter_hash
+		try:
+			state = db.get(models.ScrapeState, app_id)
+			if state is not None and state.filter_hash == filter_hash:
+				latest, existing_db_count = state.latest_review_date, state.existing_count
+			else:
+				latest, existing_db_count = db.execute(
+					_existing_stats_stmt(settings_for_game.filter_key), {"app_id": app_id}
+				).one()
+				existing_db_count = int(existing_db_count or 0)
+				_upsert_scrape_state(db, {
+					"app_id": app_id,
+					"filter_hash": filter_hash,
+					"existing_count": existing_db_count,
+					"latest_review_date": latest,
+					"updated_at": datetime.utcnow(),
+				})
+			# Ends the read transaction too, so page saves start from a fresh snapshot
+			db.commit()
+			return latest, existing_db_count
+		except Exception:
+			db.rollback()
+			raise
+
+	async def _run_in_writer(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self._writer, functools.partial(fn, *args, **kwargs))
+
+	async def _fetch_page(self, app_id: int, cursor: str, settings_for_game: ScrapeSettings) -> Dict[str, Any]:
+		# Steam filters language, sentiment and purchase type itself (`keep`
+		# re-checks only the language). The early-access, free-key and playtime
+		# filters have no query parameter and stay client-side.
+		params = {
+			"json": 1,
+			"filter": "recent",
+			"language": settings_for_game.language,
+			"review_type": "all",
+			# Steam's own default, spelled out so the request states its scope
+			"purchase_type": "steam",
+			"num_per_page": 100,
+			"cursor": cursor,
+		}
+		url = f"https://store.steampowered.com/appreviews/{app_id}"
+		cache_key = (app_id, settings_for_game.language, cursor)
+		cached = self._page_cache.get(cache_key)
+		kwargs: Dict[str, Any] = {}
+		if cached is not None:
+			etag, last_modified, _ = cached
+			headers = {}
+			if etag:
+				headers["If-None-Match"] = etag
+			if last_modified:
+				headers["If-Modified-Since"] = last_modified
+			kwargs["headers"] = headers
+		for attempt in range(_FETCH_MAX_ATTEMPTS):
+			await self._wait_for_request_slot(settings_for_game.rate_limit_rpm)
+			start_req = time.perf_counter()
+			resp = await self._client.get(url, params=params, **kwargs)
+			elapsed = time.perf_counter() - start_req
+			# Exponential moving average of request time so the ETA follows recent latency
+			self.progress.requests_made += 1
+			if self.progress.avg_request_seconds <= 0:
+				self.progress.avg_request_seconds = elapsed
+			else:
+				alpha = 0.2
+				self.progress.avg_request_seconds = alpha * elapsed + (1 - alpha) * self.progress.avg_request_seconds
+			if resp.status_code not in _RETRY_STATUSES or attempt == _FETCH_MAX_ATTEMPTS - 1:
+				break
+			delay = _retry_delay(resp, attempt)
+			self.progress.log(f"Steam returned {resp.status_code} for {app_id}; retrying in {delay:.1f}s")
+			await asyncio.sleep(delay)
+
+		if resp.status_code == 304 and cached is not None:
+			# Unchanged since we last fetched it: replay the stored body
+			self._page_cache.move_to_end(cache_key)
+			body = cached[2]
+		else:
+			resp.raise_for_status()
+			body = resp.content
+			etag = resp.headers.get("etag")
+			last_modified = resp.headers.get("last-modified")
+			if etag or last_modified:
+				self._page_cache[cache_key] = (etag, last_modified, body)
+				self._page_cache.move_to_end(cache_key)
+				while len(self._page_cache) > _PAGE_CACHE_MAX_ENTRIES:
+					self._page_cache.popitem(last=False)
+		if len(body) > _INLINE_PARSE_MAX_BYTES:
+			# Large bodies would stall every other in-flight game while decoding
+			return await asyncio.to_thread(_decode_json, body)
+		return _decode_json(body)
+
+	def _save_reviews(
 		self,
-		app_id: int,
-		reviews: List[Dict[str, Any]],
-		settings_for_game: ScrapeSettings,
-		threshold_start: Optional[datetime],
+		db: Session,
+		candidates: List[Tuple[int, Dict[str, Any]]],
+		filter_hash: str,
+		seen_ids: Set[str],
 		max_to_save: Optional[int] = None,
 	) -> int:
-		"""Apply filters and persist reviews. Return number saved."""
-		# Normalize comparison baselines to naive UTC to match DB storage
-		if threshold_start and threshold_start.tzinfo is not None:
-			threshold_start = threshold_start.replace(tzinfo=None)
-		end_date_cmp: Optional[datetime] = settings_for_game.end_date
-		if end_date_cmp and end_date_cmp.tzinfo is not None:
-			end_date_cmp = end_date_cmp.replace(tzinfo=None)
-
-		db: Session = SessionLocal()
-		saved = 0
+		"""Persist normalized reviews not yet stored. Return number saved."""
+		if not candidates:
+			return 0
+		app_id = candidates[0][1]["app_id"]
+
 		try:
-			for r in reviews:
+			# Duplicates are left to ON CONFLICT DO NOTHING. Only when the cap
+			# would cut the page short do we look up which IDs are already
+			# stored, so that stored reviews don't use up the cap.
+			# IDs handled on this page: stored before, or queued below. Checked
+			# alongside seen_ids, which is only extended after the commit.
+			page_ids: Set[str] = set()
+			if max_to_save is not None and len(candidates) > max_to_save:
+				unknown_ids = {row["review_id"] for _, row in candidates if row["review_id"] not in seen_ids}
+				if unknown_ids:
+					page_ids.update(
+						db.execute(select(models.Review.review_id).where(models.Review.review_id.in_(unknown_ids))).scalars()
+					)
+			rows: List[Dict[str, Any]] = []
+			saved = 0
+			# One timestamp per page instead of the column default firing per row
+			scraped_at = datetime.utcnow()
+			for ts, row in candidates:
 				# Respect per-call cap if requested
-				if max_to_save is not None and saved >= max_to_save:
+				if max_to_save is not None and len(rows) >= max_to_save:
 					break
-				raw_recommendationid = r.get("recommendationid")
-				if raw_recommendationid is None:
+				# Skip duplicates (known to be stored, or repeated within this page)
+				review_id = row["review_id"]
+				if review_id in seen_ids or review_id in page_ids:
 					continue
-				review_id = str(raw_recommendationid)
+				page_ids.add(review_id)
+
+				row["review_date"] = naive_utc_from_unix(ts)
+				if row["timestamp_updated"] is not None:
+					row["timestamp_updated"] = naive_utc_from_unix(row["timestamp_updated"])
+				if row["author_last_played"] is not None:
+					row["author_last_played"] = naive_utc_from_unix(row["author_last_played"])
+				row["scraped_at"] = scraped_at
+				rows.append(row)
+
+			if rows:
+				# Plain dicts through the Core connection: no ORM bulk-insert
+				# processing, identity map or per-object events
+				try:
+					stmt = _insert_ignore_duplicates(db)
+					if db.get_bind().dialect.insert_executemany_returning:
+						# Rows skipped by ON CONFLICT return nothing, so this is
+						# exactly the set of reviews this call stored
+						inserted = set(db.connection().execute(stmt.returning(models.Review.review_id), rows).scalars())
+						rows = [row for row in rows if row["review_id"] in inserted]
+						saved = len(rows)
+					else:
+						result = db.connection().execute(stmt, rows)
+						# Rows skipped by ON CONFLICT are not counted in rowcount
+						if result.supports_sane_multi_rowcount() and result.rowcount >= 0:
+							saved = result.rowcount
+						else:
+							saved = len(rows)
+				except IntegrityError:
+					# Only reachable on dialects without ON CONFLICT support, when
+					# another writer stored some of these first
+					db.rollback()
+					rows = _insert_rows_individually(db, rows)
+					saved = len(rows)
+				if saved:
+					# Keep the cached resume counters in step, in the same transaction.
+					# A single UPDATE avoids re-loading the (commit-expired) state row per page.
+					batch_latest = max(row["review_date"] for row in rows)
+					latest_col = models.ScrapeState.latest_review_date
+					db.execute(
+						update(models.ScrapeState)
+						.where(models.ScrapeState.app_id == app_id, models.ScrapeState.filter_hash == filter_hash)
+						.values(
+							existing_count=models.ScrapeState.existing_count + saved,
+							latest_review_date=case(
+								(latest_col.is_(None), batch_latest),
+								(latest_col < batch_latest, batch_latest),
+								else_=latest_col,
+							),
+							updated_at=scraped_at,
+						)
+					)
+			# Commit per batch; every ID in `rows` is stored now, by us or before
+			db.commit()
+			seen_ids.update(page_ids)
+			return saved
+		except Exception:
+			db.rollback()
+			raise
 
-				review_text = r.get("review") or ""
-				ts = r.get("timestamp_created")
-				if ts is None:
-					# Skip reviews without a timestamp
-					continue
-				review_date_aware = utc_from_unix(int(ts))
-				review_date = review_date_aware.replace(tzinfo=None)
-				playtime_minutes = (r.get("author") or {}).get("playtime_forever") or 0
-				playtime_hours = float(playtime_minutes) / 60.0
-				review_type = "positive" if r.get("voted_up") else "negative"
-				language = (r.get("language") or settings_for_game.language).lower()
-				early_access = bool(r.get("written_during_early_access"))
-				received_for_free = bool(r.get("received_for_free"))
-
-				# Filters
-				if threshold_start and review_date < threshold_start:
-					continue
-				if end_date_cmp and review_date > end_date_cmp:
-					continue
-				# Playtime filters (hours)
-				min_pt = settings_for_game.min_playtime
-				max_pt = settings_for_game.max_playtime
-				if min_pt is not None and playtime_hours < float(min_pt):
-					continue
-				if max_pt is not None and playtime_hours > float(max_pt):
-					continue
-				if settings_for_game.early_access == "exclude" and early_access:
-					continue
-				if settings_for_game.early_access == "only" and not early_access:
-					continue
-				if settings_for_game.received_for_free == "exclude" and received_for_free:
-					continue
-				if settings_for_game.received_for_free == "only" and not received_for_free:
-					continue
 
-				# Skip duplicates
-				existing = db.get(models.Review, review_id)
-				if existing:
-					continue
+def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+	"""Seconds to wait before retrying: the server's Retry-After or exponential backoff, plus jitter."""
+	backoff = _RETRY_BASE_SECONDS * 2 ** attempt
+	try:
+		retry_after = float(resp.headers.get("retry-after") or 0)
+	except ValueError:
+		# HTTP-date form; the backoff is close enough
+		retry_after = 0.0
+	return max(retry_after, backoff) + random.uniform(0, backoff / 2)
 
-				obj = models.Review(
-					review_id=review_id,
-					app_id=app_id,
-					review_text=review_text,
-					review_date=review_date,
-					playtime_hours=playtime_hours,
-					review_type=review_type,
-					language=language,
-					early_access=early_access,
-					received_for_free=received_for_free,
-					# Additional fields from Steam payload
-					timestamp_updated=(utc_from_unix(int(r.get("timestamp_updated"))) if r.get("timestamp_updated") is not None else None),
-					votes_helpful=(r.get("votes_helpful") if r.get("votes_helpful") is not None else None),
-					weighted_vote_score=(r.get("weighted_vote_score") if r.get("weighted_vote_score") is not None else None),
-					comment_count=(r.get("comment_count") if r.get("comment_count") is not None else None),
-					author_num_games_owned=((r.get("author") or {}).get("num_games_owned") if (r.get("author") or {}).get("num_games_owned") is not None else None),
-					author_num_reviews=((r.get("author") or {}).get("num_reviews") if (r.get("author") or {}).get("num_reviews") is not None else None),
-					author_playtime_last_two_weeks=((r.get("author") or {}).get("playtime_last_two_weeks") if (r.get("author") or {}).get("playtime_last_two_weeks") is not None else None),
-					author_last_played=(utc_from_unix(int((r.get("author") or {}).get("last_played"))) if (r.get("author") or {}).get("last_played") is not None else None),
-					steam_purchase=(bool(r.get("steam_purchase")) if r.get("steam_purchase") is not None else None),
-				)
-				db.add(obj)
-				saved += 1
 
-			# Commit per batch
+def _insert_rows_individually(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	"""Insert rows one per transaction, skipping those that conflict. Return the stored rows."""
+	stored: List[Dict[str, Any]] = []
+	for row in rows:
+		try:
+			db.connection().execute(insert(models.Review), row)
 			db.commit()
-			return saved
+			stored.append(row)
 		except IntegrityError:
 			db.rollback()
-			return saved
-		finally:
-			db.close()
+	return stored
+
+
+def _normalize_reviews(
+	app_id: int,
+	reviews: List[Dict[str, Any]],
+	keep: Callable[[Dict[str, Any]], bool],
+	default_language: str,
+	threshold_ts: Optional[float] = None,
+	end_ts: Optional[float] = None,
+) -> Tuple[int, List[Tuple[int, Dict[str, Any]]]]:
+	"""Single pass over a Steam page.
+
+	Returns the newest `timestamp_created` on the page and, in page order,
+	`(timestamp, row)` for each review inside the date bounds that passes
+	`keep`. Rows hold `reviews` column values, except that the datetime
+	columns are still epoch seconds.
+	"""
+	max_ts = 0
+	past_threshold = False
+	candidates: List[Tuple[int, Dict[str, Any]]] = []
+	for r in reviews:
+		raw_ts = r.get("timestamp_created")
+		ts = int(raw_ts or 0)
+		if ts > max_ts:
+			max_ts = ts
+		# Cheapest rejects first; the row dict is only built for survivors
+		if past_threshold or raw_ts is None:
+			continue
+		raw_recommendationid = r.get("recommendationid")
+		if raw_recommendationid is None:
+			continue
+		# Pages come newest-first (filter=recent), so once one review is
+		# older than the threshold the rest are too.
+		if threshold_ts is not None and ts < threshold_ts:
+			past_threshold = True
+			continue
+		if end_ts is not None and ts > end_ts:
+			continue
+		# Language / early access / free key / playtime filters
+		if not keep(r):
+			continue
+		author = r.get("author") or {}
+		steam_purchase = r.get("steam_purchase")
+		candidates.append((ts, {
+			"review_id": str(raw_recommendationid),
+			"app_id": app_id,
+			"review_text": r.get("review") or "",
+			"review_date": ts,
+			"playtime_hours": float(author.get("playtime_forever") or 0) / 60.0,
+			"review_type": "positive" if r.get("voted_up") else "negative",
+			"language": (r.get("language") or default_language).lower(),
+			"early_access": bool(r.get("written_during_early_access")),
+			"received_for_free": bool(r.get("received_for_free")),
+			# Additional fields from Steam payload
+			"timestamp_updated": r.get("timestamp_updated"),
+			"votes_helpful": r.get("votes_helpful"),
+			"weighted_vote_score": r.get("weighted_vote_score"),
+			"comment_count": r.get("comment_count"),
+			"author_num_games_owned": author.get("num_games_owned"),
+			"author_num_reviews": author.get("num_reviews"),
+			"author_playtime_last_two_weeks": author.get("playtime_last_two_weeks"),
+			"author_last_played": author.get("last_played"),
+			"steam_purchase": bool(steam_purchase) if steam_purchase is not None else None,
+		}))
+	return max_ts, candidates
+
+
+def _insert_ignore_duplicates(db: Session):
+	"""INSERT for reviews that skips rows whose review_id already exists."""
+	dialect = db.get_bind().dialect.name
+	if dialect == "sqlite":
+		return sqlite_insert(models.Review).on_conflict_do_nothing(index_elements=["review_id"])
+	if dialect == "postgresql":
+		return pg_insert(models.Review).on_conflict_do_nothing(index_elements=["review_id"])
+	return insert(models.Review)
+
+
+def _upsert_scrape_state(db: Session, values: Dict[str, Any]) -> None:
+	"""Store a game's scrape_state row in one statement, replacing any existing one."""
+	dialect = db.get_bind().dialect.name
+	if dialect not in ("sqlite", "postgresql"):
+		db.merge(models.ScrapeState(**values))
+		return
+	stmt = (sqlite_insert if dialect == "sqlite" else pg_insert)(models.ScrapeState).values(**values)
+	db.execute(stmt.on_conflict_do_update(
+		index_elements=["app_id"],
+		set_={k: stmt.excluded[k] for k in values if k != "app_id"},
+	))
 
 
 scraper_service = ScraperService()
@@ -2,31 +2,97 @@
 
 Provides a simple function `search_local_apps(query, start, count)` which returns
 a tuple `(games, total)` where `games` is a list of {app_id, name} dicts and
-`total` is an integer representing the number of matches (best-effort).
+`total` is an integer representing the number of matches (best-effort; for
+name searches a lower bound that only says whether another page exists).
 
 This module intentionally removes Python-side fuzzy scoring and relies only on
 exact AppID lookup, FTS5 prefix matches, and case-insensitive substring LIKE
-matches.
+matches (served by the `steam_apps_trigram` index when it has been built).
 """
 from typing import List, Tuple, Dict
 import sqlite3
 import re
+import string
+import threading
 
 from .config import settings
+from .database import SQLITE_PRAGMAS
 
 
 DB_PATH = settings.DATABASE_URL.replace("sqlite:///", "")
 
+# One connection per worker thread, kept open between searches so the schema
+# parse and page cache carry over from one keystroke to the next
+_tls = threading.local()
+
 
 def _connect():
-	conn = sqlite3.connect(DB_PATH)
+	conn = getattr(_tls, "conn", None)
+	if conn is not None:
+		return conn
+	conn = sqlite3.connect(DB_PATH, check_same_thread=False)
 	conn.row_factory = sqlite3.Row
+	# Same tuning as the app's engine connections (WAL, page cache, mmap);
+	# searches never write, so the connection is also made read-only.
+	for pragma in SQLITE_PRAGMAS:
+		conn.execute(pragma)
+	conn.execute("PRAGMA query_only=1")
+	_tls.conn = conn
 	return conn
 
 
+# Substring index over app names. The trigram tokenizer lets `name LIKE '%q%'`
+# use the index instead of scanning every row of steam_apps. It is an
+# external-content table, so it must be rebuilt whenever steam_apps is reloaded.
+TRIGRAM_DDL = (
+	"CREATE VIRTUAL TABLE IF NOT EXISTS steam_apps_trigram USING fts5("
+	"name, content='steam_apps', content_rowid='app_id', tokenize='trigram')"
+)
+
+
+def rebuild_trigram_index(conn: sqlite3.Connection) -> bool:
+	"""Create (if needed) and rebuild `steam_apps_trigram` from `steam_apps`.
+
+	Returns False when this SQLite build has no trigram tokenizer (< 3.34);
+	searches then keep using the LIKE scan on `steam_apps`.
+	"""
+	try:
+		conn.execute(TRIGRAM_DDL)
+		conn.execute("INSERT INTO steam_apps_trigram(steam_apps_trigram) VALUES('rebuild')")
+		# Merge the b-trees the rebuild leaves behind so queries probe one segment
+		conn.execute("INSERT INTO steam_apps_trigram(steam_apps_trigram) VALUES('optimize')")
+		conn.commit()
+		return True
+	except sqlite3.OperationalError:
+		conn.rollback()
+		return False
+
+
+def _page(rows: List[sqlite3.Row], start: int, count: int) -> Tuple[List[Dict], int]:
+	"""Games and total for rows fetched with `LIMIT count + 1`.
+
+	The extra row only signals that more matches exist, so the total is a
+	lower bound (one past this page) rather than the result of a COUNT scan;
+	callers report that as `has_more` (total > start + len(games)).
+	"""
+	games = _rows_to_games(rows[:count])
+	if len(rows) > count:
+		return (games, start + count + 1)
+	return (games, start + len(games))
+
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+# Deletes every ASCII character the regex above would remove
+_ASCII_STRIP = str.maketrans("", "", "".join(
+	c for c in map(chr, range(128)) if not (c in string.ascii_lowercase or c in string.digits or c.isspace())
+))
+
+
 def _normalize_text(s: str) -> str:
-	# Lowercase and strip non-alphanumeric characters for robust matching
-	return re.sub(r"[^a-z0-9\s]", "", (s or "").lower())
+	# Lowercase and strip non-alphanumeric characters for robust matching.
+	# Queries are almost always ASCII, which translate() handles on its own.
+	s = (s or "").lower().translate(_ASCII_STRIP)
+	return s if s.isascii() else _NON_ALNUM_RE.sub("", s)
 
 
 def _rows_to_games(rows: List[sqlite3.Row], limit: int = None) -> List[Dict]:
@@ -73,9 +139,8 @@ def search_local_apps(query: str, start: int = 0, count: int = 200) -> Tuple[Lis
 	if not q:
 		return ([], 0)
 
-	conn = _connect()
+	cur = _connect().cursor()
 	try:
-		cur = conn.cursor()
 
 		# If the query is numeric, treat it as an AppID lookup and return exact matches
 		if q.isdigit():
@@ -110,7 +175,7 @@ def search_local_apps(query: str, start: int = 0, count: int = 200) -> Tuple[Lis
 		try:
 			cur.execute(
 				"SELECT rowid, name FROM steam_apps_fts WHERE name MATCH ? LIMIT ? OFFSET ?",
-				(fts_query, count, start),
+				(fts_query, count + 1, start),
 			)
 			rows = cur.fetchall()
 		except Exception:
@@ -118,35 +183,29 @@ def search_local_apps(query: str, start: int = 0, count: int = 200) -> Tuple[Lis
 			rows = []
 
 		if rows:
-			games = _rows_to_games(rows, limit=count)
-			# Estimate total using COUNT on FTS (best-effort)
-			try:
-				cur.execute("SELECT COUNT(*) as c FROM steam_apps_fts WHERE name MATCH ?", (fts_query,))
-				total = int(cur.fetchone()[0] or 0)
-			except Exception:
-				total = len(games)
-			return (games, total)
+			return _page(rows, start, count)
 
-		# Substring LIKE search on main table (case-insensitive)
+		# Substring LIKE search (case-insensitive): through the trigram index
+		# when it exists, otherwise a scan of the main table
 		like_q = f"%{norm_q or q}%"
-		cur.execute(
-			"SELECT app_id, name FROM steam_apps WHERE lower(name) LIKE ? LIMIT ? OFFSET ?",
-			(like_q, count, start),
-		)
+		try:
+			cur.execute(
+				"SELECT rowid, name FROM steam_apps_trigram WHERE name LIKE ? LIMIT ? OFFSET ?",
+				(like_q, count + 1, start),
+			)
+		except sqlite3.OperationalError:
+			cur.execute(
+				"SELECT app_id, name FROM steam_apps WHERE lower(name) LIKE ? LIMIT ? OFFSET ?",
+				(like_q, count + 1, start),
+			)
 		rows = cur.fetchall()
 		if rows:
-			games = _rows_to_games(rows, limit=count)
-			try:
-				cur.execute("SELECT COUNT(*) FROM steam_apps WHERE lower(name) LIKE ?", (like_q,))
-				total = int(cur.fetchone()[0] or 0)
-			except Exception:
-				total = len(games)
-			return (games, total)
+			return _page(rows, start, count)
 
 		# No matches found
 		return ([], 0)
 	finally:
-		conn.close()
+		cur.close()
 
 
 def search_local_apps_with_reviews(query: str, start: int = 0, count: int = 200) -> Tuple[List[Dict], int]:
@@ -160,9 +219,8 @@ def search_local_apps_with_reviews(query: str, start: int = 0, count: int = 200)
     if not q:
         return ([], 0)
 
-    conn = _connect()
+    cur = _connect().cursor()
     try:
-        cur = conn.cursor()
 
         # If the query is numeric, treat it as an AppID lookup and return exact matches
         if q.isdigit():
@@ -202,39 +260,33 @@ def search_local_apps_with_reviews(query: str, start: int = 0, count: int = 200)
         try:
             cur.execute(
                 "SELECT rowid, name FROM steam_apps_fts WHERE name MATCH ? AND rowid IN (SELECT DISTINCT app_id FROM reviews) LIMIT ? OFFSET ?",
-                (fts_query, count, start),
+                (fts_query, count + 1, start),
             )
             rows = cur.fetchall()
         except Exception:
             rows = []
 
         if rows:
-            games = _rows_to_games(rows, limit=count)
-            try:
-                cur.execute("SELECT COUNT(DISTINCT app_id) as c FROM reviews WHERE app_id IN (SELECT rowid FROM steam_apps_fts WHERE name MATCH ?)", (fts_query,))
-                total = int(cur.fetchone()[0] or 0)
-            except Exception:
-                total = len(games)
-            return (games, total)
+            return _page(rows, start, count)
 
-        # Substring LIKE search on main table restricted to reviewed apps
+        # Substring LIKE search restricted to reviewed apps (trigram index when available)
         like_q = f"%{norm_q or q}%"
-        cur.execute(
-            "SELECT app_id, name FROM steam_apps WHERE lower(name) LIKE ? AND app_id IN (SELECT DISTINCT app_id FROM reviews) LIMIT ? OFFSET ?",
-            (like_q, count, start),
-        )
+        try:
+            cur.execute(
+                "SELECT rowid, name FROM steam_apps_trigram WHERE name LIKE ? AND rowid IN (SELECT DISTINCT app_id FROM reviews) LIMIT ? OFFSET ?",
+                (like_q, count + 1, start),
+            )
+        except sqlite3.OperationalError:
+            cur.execute(
+                "SELECT app_id, name FROM steam_apps WHERE lower(name) LIKE ? AND app_id IN (SELECT DISTINCT app_id FROM reviews) LIMIT ? OFFSET ?",
+                (like_q, count + 1, start),
+            )
         rows = cur.fetchall()
         if rows:
-            games = _rows_to_games(rows, limit=count)
-            try:
-                cur.execute("SELECT COUNT(DISTINCT app_id) FROM steam_apps WHERE lower(name) LIKE ? AND app_id IN (SELECT DISTINCT app_id FROM reviews)", (like_q,))
-                total = int(cur.fetchone()[0] or 0)
-            except Exception:
-                total = len(games)
-            return (games, total)
+            return _page(rows, start, count)
 
         return ([], 0)
     finally:
-        conn.close()
+        cur.close()
 
 
@@ -1,8 +1,25 @@
-from typing import Dict, List
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
 
 import httpx
 
 from .config import settings
+from .http_clients import get_client
+
+try:
+	import orjson
+except Exception:
+	orjson = None  # optional; fall back to the stdlib json module
+
+try:
+	import ijson
+except Exception:
+	ijson = None  # optional; without it GetAppList is decoded in one piece
+
+
+def _decode_json(body: bytes) -> Any:
+	return orjson.loads(body) if orjson is not None else json.loads(body)
 
 
 async def search_games_realtime(query: str, start: int = 0, count: int = 50) -> List[Dict]:
@@ -11,76 +28,109 @@ async def search_games_realtime(query: str, start: int = 0, count: int = 50) ->
 	Returns a list of {app_id, name} dicts.
 	"""
 	q = query.strip()
-	async with httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT_SECONDS) as client:
-		if q.isdigit():
-			# Query specific app details
-			app_id = int(q)
-			url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&l=english"
+	client = get_client()
+	if q.isdigit():
+		# Query specific app details
+		app_id = int(q)
+		url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&l=english"
+		resp = await client.get(url)
+		resp.raise_for_status()
+		data = _decode_json(resp.content)
+		entry = data.get(str(app_id)) or {}
+		if entry.get("success") and entry.get("data"):
+			name = (entry["data"].get("name") or "").strip()
+			if name:
+				return [{"app_id": app_id, "name": name}]
+		return []
+	else:
+		# Store search for text queries
+		# allow paging via start/count
+		# The public storesearch endpoint appears to limit results per request (commonly 10),
+		# so if the caller requests more, page multiple times and aggregate results.
+		results: List[Dict] = []
+		remaining = count
+		current_start = start
+		# conservative per-request chunk; keep small to avoid huge responses
+		while remaining > 0:
+			chunk_size = min(50, remaining)
+			url = (
+				f"https://store.steampowered.com/api/storesearch/?term={httpx.QueryParams({'term': q})['term']}"
+				f"&l=english&cc=US&start={current_start}&count={chunk_size}"
+			)
 			resp = await client.get(url)
 			resp.raise_for_status()
-			data = resp.json()
-			entry = data.get(str(app_id)) or {}
-			if entry.get("success") and entry.get("data"):
-				name = (entry["data"].get("name") or "").strip()
-				if name:
-					return [{"app_id": app_id, "name": name}]
-			return []
-		else:
-			# Store search for text queries
-			# allow paging via start/count
-			# The public storesearch endpoint appears to limit results per request (commonly 10),
-			# so if the caller requests more, page multiple times and aggregate results.
-			results: List[Dict] = []
-			remaining = count
-			current_start = start
-			# conservative per-request chunk; keep small to avoid huge responses
-			while remaining > 0:
-				chunk_size = min(50, remaining)
-				url = (
-					f"https://store.steampowered.com/api/storesearch/?term={httpx.QueryParams({'term': q})['term']}"
-					f"&l=english&cc=US&start={current_start}&count={chunk_size}"
-				)
-				resp = await client.get(url)
-				resp.raise_for_status()
-				data = resp.json() or {}
-				items = data.get("items", [])
-				if not items:
-					break
-				for item in items:
-					app_id = item.get("id") or item.get("appid")
-					name = (item.get("name") or "").strip()
-					if app_id and name:
-						results.append({"app_id": int(app_id), "name": name})
-				# advance
-				fetched = len(items)
-				remaining -= fetched
-				current_start += fetched
-				# if fewer items returned than requested chunk, we've reached the end
-				if fetched < chunk_size:
-					break
-			# Trim to exactly requested count in case of overshoot
-			return results[:count]
+			data = _decode_json(resp.content) or {}
+			items = data.get("items", [])
+			if not items:
+				break
+			for item in items:
+				app_id = item.get("id") or item.get("appid")
+				name = (item.get("name") or "").strip()
+				if app_id and name:
+					results.append({"app_id": int(app_id), "name": name})
+			# advance
+			fetched = len(items)
+			remaining -= fetched
+			current_start += fetched
+			# if fewer items returned than requested chunk, we've reached the end
+			if fetched < chunk_size:
+				break
+		# Trim to exactly requested count in case of overshoot
+		return results[:count]
+
+
+class _AsyncByteStream:
+	"""Async file-like view of a streamed response, for ijson's incremental parser."""
+
+	def __init__(self, resp: httpx.Response) -> None:
+		self._chunks = resp.aiter_bytes()
+
+	async def read(self, size: int = -1) -> bytes:
+		if size == 0:
+			# ijson probes with read(0) to tell bytes from str
+			return b""
+		try:
+			return await self._chunks.__anext__()
+		except StopAsyncIteration:
+			return b""
+
+
+def _app_entry(entry: Dict) -> Optional[Dict]:
+	appid = entry.get("appid") or entry.get("appID") or entry.get("app_id")
+	name = (entry.get("name") or "").strip()
+	if appid is not None and name:
+		return {"app_id": int(appid), "name": name}
+	return None
 
 
 async def get_app_list() -> List[Dict]:
 	"""Fetch the full Steam app list (appid + name) from the Steam Web API.
 
-	Returns a list of {app_id, name} dicts.
+	Returns a list of {app_id, name} dicts. With ijson installed the body is
+	parsed as it downloads, so the multi-megabyte document is never held in
+	memory whole.
 	"""
 	url = f"{settings.STEAM_API_BASE_URL}/ISteamApps/GetAppList/v2/"
-	async with httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT_SECONDS) as client:
-		resp = await client.get(url)
-		resp.raise_for_status()
-		data = resp.json() or {}
-		apps = data.get("applist", {}).get("apps", []) or []
-		results: List[Dict] = []
-		for entry in apps:
-			appid = entry.get("appid") or entry.get("appID") or entry.get("app_id")
-			name = (entry.get("name") or "").strip()
-			if appid is not None and name:
-				results.append({"app_id": int(appid), "name": name})
+	results: List[Dict] = []
+	if ijson is not None:
+		async with get_client().stream("GET", url) as resp:
+			resp.raise_for_status()
+			async for entry in ijson.items(_AsyncByteStream(resp), "applist.apps.item"):
+				app = _app_entry(entry)
+				if app is not None:
+					results.append(app)
 		return results
 
+	resp = await get_client().get(url)
+	resp.raise_for_status()
+	# Several MB of JSON: decode off the event loop
+	data = await asyncio.to_thread(_decode_json, resp.content) or {}
+	for entry in data.get("applist", {}).get("apps", []) or []:
+		app = _app_entry(entry)
+		if app is not None:
+			results.append(app)
+	return results
+
 
 async def get_review_count(app_id: int) -> int:
     """Query Steam store appreviews endpoint and return the total review count reported by Steam.
@@ -89,16 +139,15 @@ async def get_review_count(app_id: int) -> int:
     """
     url = f"https://store.steampowered.com/appreviews/{app_id}"
     params = {"json": 1, "num_per_page": 1, "filter": "all"}
-    async with httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT_SECONDS) as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json() or {}
-        qsum = data.get("query_summary") or {}
-        # Steam may return total_reviews or num_reviews depending on payload
-        total = qsum.get("total_reviews") or qsum.get("num_reviews") or 0
-        try:
-            return int(total or 0)
-        except Exception:
-            return 0
+    resp = await get_client().get(url, params=params)
+    resp.raise_for_status()
+    data = _decode_json(resp.content) or {}
+    qsum = data.get("query_summary") or {}
+    # Steam may return total_reviews or num_reviews depending on payload
+    total = qsum.get("total_reviews") or qsum.get("num_reviews") or 0
+    try:
+        return int(total or 0)
+    except Exception:
+        return 0
 
 
@@ -1,58 +1,187 @@
 """Simple backfill tool to fetch Steam app list and populate local SQLite DB.
 
-Usage: python -m backend.tools.fetch_applist
+Usage: python -m backend.tools.fetch_applist [--fast] [--deep-check]
 """
-import json
+import argparse
+from json.encoder import encode_basestring_ascii
 import os
+import queue
 import sqlite3
 import sys
+import threading
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..search_sqlite import rebuild_trigram_index
+
+try:
+    import ijson
+except Exception:
+    ijson = None  # optional; without it the response is decoded in one piece
 
 # Get the project root directory (where app.db should be)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DB_PATH = PROJECT_ROOT / "app.db"
 SCHEMA_PATH = PROJECT_ROOT / "backend" / "schema.sql"
-BATCH = 1000
+# Apps per staging batch. executemany binds one row at a time, so SQLite's
+# variable limit doesn't apply; larger batches just mean fewer merge passes.
+BATCH = 5000
+# Beyond this many new/renamed apps a full FTS rebuild is cheaper than patching
+FTS_INCREMENTAL_MAX = 20000
+FINGERPRINT_KEY = "steam_apps_fingerprint"
+
+# Applied on every connection before the schema is touched. page_size must
+# come first: it only takes effect on a database that hasn't been written
+# yet, and switching to WAL writes the header. Existing files keep theirs.
+PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    # No checkpoints mid-load; main() runs one when the load is done
+    "PRAGMA wal_autocheckpoint=0",
+)
+# --fast: no rollback journal or syncs at all. A crash mid-load can corrupt
+# the whole file, and app.db also holds scraped reviews, games, settings and
+# API keys, so main() only applies these to a database it is creating.
+FAST_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+)
+
+
+def make_session() -> requests.Session:
+    """HTTP session with a keep-alive pool and retries for transient Steam errors."""
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared so the recovery path's second fetch reuses the connection
+_session = make_session()
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), cached_statements=256)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
-def init_db(conn: sqlite3.Connection) -> None:
+def init_db(conn: sqlite3.Connection, fast: bool = False) -> None:
     with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
         conn.executescript(f.read())
+    if fast:
+        # After the schema script, which sets WAL/NORMAL itself
+        for pragma in FAST_PRAGMAS:
+            conn.execute(pragma)
 
 
-def upsert_batch(conn: sqlite3.Connection, rows: Iterable[dict]) -> None:
-    cur = conn.cursor()
+# Statements run for every batch; kept as constants so each is prepared once
+# and then served from the connection's statement cache
+_STAGE_SQL = "INSERT OR REPLACE INTO stage_apps(app_id, name, raw) VALUES (?, ?, ?)"
+# New and renamed apps, with the name the FTS index still holds
+_DELTA_SQL = (
+    "INSERT OR IGNORE INTO fts_delta(app_id, old_name) "
+    "SELECT s.app_id, a.name FROM stage_apps s LEFT JOIN steam_apps a ON a.app_id = s.app_id "
+    "WHERE a.app_id IS NULL OR a.name <> s.name"
+)
+_UPSERT_SQL = (
+    "INSERT INTO steam_apps(app_id, name, raw, last_seen) "
+    "SELECT app_id, name, raw, datetime('now') FROM stage_apps WHERE true "
+    "ON CONFLICT(app_id) DO UPDATE SET name=excluded.name, raw=excluded.raw, last_seen=datetime('now') "
+    "WHERE steam_apps.name <> excluded.name"
+)
+
+
+def upsert_batch(cur: sqlite3.Cursor, rows: Iterable[dict]) -> int:
+    """Merge a batch into steam_apps through a temp staging table.
+
+    The batch is bulk-loaded into `stage_apps`, then merged with a single
+    set-based upsert that leaves unchanged apps alone, so a re-run only
+    writes pages holding new or renamed apps. Expects create_stage_tables()
+    to have run on the cursor's connection. Returns the number of apps
+    actually inserted or renamed.
+    """
+    cur.execute("DELETE FROM stage_apps")
+    # Later duplicates win, as they did with row-by-row upserts
     cur.executemany(
-        "INSERT INTO steam_apps(app_id, name, raw, last_seen) VALUES (?, ?, ?, datetime('now')) "
-        "ON CONFLICT(app_id) DO UPDATE SET name=excluded.name, raw=excluded.raw, last_seen=datetime('now')",
-        [(r["app_id"], r["name"], json.dumps(r)) for r in rows],
+        _STAGE_SQL,
+        # Same text json.dumps(r) gives for an {app_id, name} dict, without serializing the dict
+        ((r["app_id"], r["name"], f'{{"app_id": {r["app_id"]}, "name": {encode_basestring_ascii(r["name"])}}}') for r in rows),
     )
-    conn.commit()
+    # Recorded so populate_fts can patch the index instead of rebuilding it
+    cur.execute(_DELTA_SQL)
+    cur.execute(_UPSERT_SQL)
+    return cur.rowcount
+
+
+def create_stage_tables(cur: sqlite3.Cursor) -> None:
+    """Create the per-connection TEMP tables used during a load."""
+    cur.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS stage_apps(app_id INTEGER PRIMARY KEY, name TEXT NOT NULL, raw TEXT)"
+    )
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS fts_delta(app_id INTEGER PRIMARY KEY, old_name TEXT)")
+
+
+def table_fingerprint(conn: sqlite3.Connection) -> str:
+    """Cheap summary of steam_apps' contents, compared across runs."""
+    row = conn.execute("SELECT COUNT(*), MAX(app_id), SUM(LENGTH(name)) FROM steam_apps").fetchone()
+    return "|".join(str(v) for v in row)
 
 
-def fetch_applist() -> list:
+def fetch_applist() -> Iterator[dict]:
+    """Request the app list and return an iterator of {app_id, name} dicts.
+
+    The request is made (and its status checked) up front; with ijson
+    installed the body is then parsed as it downloads, so apps reach the
+    database without the whole document being held in memory.
+    """
     url = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    data = resp.json() or {}
-    apps = data.get("applist", {}).get("apps", []) or []
-    results = []
-    for e in apps:
-        appid = e.get("appid") or e.get("appID")
-        name = (e.get("name") or "").strip()
-        if appid is not None and name:
-            results.append({"app_id": int(appid), "name": name})
-    return results
-
-
-def check_db_integrity(conn: sqlite3.Connection) -> bool:
-    """Check if the database is corrupt."""
+    resp = _session.get(url, timeout=30, stream=True)
+    try:
+        resp.raise_for_status()
+    except Exception:
+        resp.close()
+        raise
+    return _iter_apps(resp)
+
+
+def _iter_apps(resp: requests.Response) -> Iterator[dict]:
+    with resp:
+        if ijson is not None:
+            # Let urllib3 undo any gzip/deflate before ijson sees the bytes
+            resp.raw.decode_content = True
+            entries = ijson.items(resp.raw, "applist.apps.item")
+        else:
+            data = resp.json() or {}
+            entries = data.get("applist", {}).get("apps", []) or []
+        for e in entries:
+            appid = e.get("appid") or e.get("appID")
+            name = (e.get("name") or "").strip()
+            if appid is not None and name:
+                yield {"app_id": int(appid), "name": name}
+
+
+def check_db_integrity(conn: sqlite3.Connection, deep: bool = False) -> bool:
+    """Check if the database is corrupt.
+
+    By default runs `quick_check`, which catches truncation and damaged
+    pages without verifying that every index matches its table; `deep`
+    runs the full `integrity_check`.
+    """
     try:
         cur = conn.cursor()
-        cur.execute("PRAGMA integrity_check;")
+        cur.execute("PRAGMA integrity_check;" if deep else "PRAGMA quick_check;")
         result = cur.fetchone()
         return result and result[0] == "ok"
     except sqlite3.Error:
@@ -77,69 +206,204 @@ def backup_corrupt_db(db_path: Path) -> bool:
     return False
 
 
-def populate_fts(conn: sqlite3.Connection) -> None:
-    """Populate the FTS table with data from steam_apps table."""
+def populate_fts(conn: sqlite3.Connection, previous: Optional[str] = None) -> None:
+    """Bring the FTS indexes over steam_apps up to date.
+
+    `previous` is steam_apps' fingerprint from before this run's inserts.
+    The fingerprint the indexes were last built from is kept in `_meta`:
+    when it matches the current one and no app changed, nothing is done;
+    when it matches `previous` (the indexes were current before the load)
+    only the new and renamed apps recorded in `fts_delta` are patched in.
+    Anything else gets a full in-place 'rebuild'.
+    """
     cur = conn.cursor()
     try:
-        # Instead of DELETE + INSERT, use INSERT OR REPLACE in batches
-        # First check if FTS table needs rebuilding
-        cur.execute("SELECT COUNT(*) FROM steam_apps")
-        apps_count = cur.fetchone()[0]
-        
-        cur.execute("SELECT COUNT(*) FROM steam_apps_fts")
-        fts_count = cur.fetchone()[0]
-        
-        if fts_count == apps_count:
-            print(f"FTS table already up to date ({fts_count} records)")
+        create_stage_tables(cur)
+        changed = cur.execute("SELECT COUNT(*) FROM fts_delta").fetchone()[0]
+        # The merge only writes new or renamed apps, so with none recorded
+        # steam_apps still matches the fingerprint taken before the load
+        fingerprint = previous if previous is not None and not changed else table_fingerprint(conn)
+        row = cur.execute("SELECT value FROM _meta WHERE key = ?", (FINGERPRINT_KEY,)).fetchone()
+        stored = row[0] if row else None
+
+        if stored == fingerprint and not changed:
+            print("FTS table already up to date")
             return
-            
-        # Drop and recreate FTS table to avoid corruption issues
+
+        if previous is not None and stored == previous and changed <= FTS_INCREMENTAL_MAX:
+            print(f"Updating FTS indexes for {changed} new or renamed apps...")
+            apply_fts_delta(cur, "steam_apps_fts")
+            cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'steam_apps_trigram'")
+            has_trigram = cur.fetchone() is not None
+            if has_trigram:
+                apply_fts_delta(cur, "steam_apps_trigram")
+            cur.execute("DELETE FROM fts_delta")
+            save_fingerprint(cur, fingerprint)
+            conn.commit()
+            if not has_trigram:
+                rebuild_trigram(conn)
+            return
+
         print("Rebuilding FTS table...")
-        cur.execute("DROP TABLE IF EXISTS steam_apps_fts;")
-        
-        # Recreate FTS table
-        cur.execute("""
-            CREATE VIRTUAL TABLE steam_apps_fts USING fts5(
-                name,
-                content='steam_apps',
-                content_rowid='app_id',
-                tokenize = 'unicode61'
-            );
-        """)
-        
-        # Rebuild the FTS index
         cur.execute("INSERT INTO steam_apps_fts(steam_apps_fts) VALUES('rebuild');")
+        cur.execute("INSERT INTO steam_apps_fts(steam_apps_fts) VALUES('optimize');")
+        cur.execute("DELETE FROM fts_delta")
+        save_fingerprint(cur, fingerprint)
         conn.commit()
-        
-        # Verify the FTS table was populated
+
         cur.execute("SELECT COUNT(*) FROM steam_apps_fts")
         final_count = cur.fetchone()[0]
         print(f"Successfully populated FTS table with {final_count} records")
-        
+
+        rebuild_trigram(conn)
+
     except sqlite3.Error as e:
         print(f"Error populating FTS table: {e}")
         raise
 
 
-def insert_apps_batch(conn: sqlite3.Connection, apps: list) -> None:
-    """Insert apps in batches with progress reporting."""
-    batch = []
-    for a in apps:
-        batch.append(a)
-        if len(batch) >= BATCH:
-            upsert_batch(conn, batch)
-            print(f"Inserted {len(batch)} apps")
+def apply_fts_delta(cur: sqlite3.Cursor, table: str) -> None:
+    """Patch an external-content FTS table with the rows listed in fts_delta."""
+    # Renamed apps: remove the tokens of the name that was indexed
+    cur.execute(
+        f"INSERT INTO {table}({table}, rowid, name) "
+        "SELECT 'delete', app_id, old_name FROM fts_delta WHERE old_name IS NOT NULL"
+    )
+    cur.execute(
+        f"INSERT INTO {table}(rowid, name) "
+        "SELECT d.app_id, a.name FROM fts_delta d JOIN steam_apps a ON a.app_id = d.app_id"
+    )
+
+
+def save_fingerprint(cur: sqlite3.Cursor, fingerprint: str) -> None:
+    cur.execute(
+        "INSERT INTO _meta(key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (FINGERPRINT_KEY, fingerprint),
+    )
+
+
+def rebuild_trigram(conn: sqlite3.Connection) -> None:
+    """Substring index used by the search LIKE fallback (needs SQLite >= 3.34)."""
+    if rebuild_trigram_index(conn):
+        print("Rebuilt trigram search index")
+    else:
+        print("Skipping trigram search index: this SQLite build has no trigram tokenizer")
+
+
+def insert_apps_batch(conn: sqlite3.Connection, apps: Iterable[dict]) -> int:
+    """Insert apps in batches with progress reporting; returns the app count.
+
+    `apps` may be a stream: it is consumed one batch at a time. All batches
+    share one transaction (committed at the end, rolled back on error), so
+    the whole load costs a single sync instead of one per batch.
+    """
+    total = 0
+    changed = 0
+    with conn:
+        # Take the write lock up front rather than on the first insert
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.cursor()
+        create_stage_tables(cur)
+        dropped = []
+        for batch in read_ahead(apps, BATCH):
+            batch_changed = upsert_batch(cur, batch)
+            total += len(batch)
+            changed += batch_changed
+            print(f"Inserted {len(batch)} apps ({batch_changed} new or renamed)")
+            if total == 10 * BATCH:
+                # Large load: maintain secondary indexes once at the end instead of per row
+                dropped = drop_secondary_indexes(conn)
+        if dropped:
+            for ddl in dropped:
+                conn.execute(ddl)
+            conn.execute("ANALYZE steam_apps")
+            print(f"Recreated {len(dropped)} index(es) on steam_apps")
+    print(f"{changed} of {total} apps were new or renamed")
+    return total
+
+
+def read_ahead(apps: Iterable[dict], size: int, depth: int = 4) -> Iterator[List[dict]]:
+    """Yield `apps` in lists of `size`, read by a background thread.
+
+    The thread keeps up to `depth` batches queued, so downloading and
+    parsing the stream overlaps the SQLite writes of earlier batches
+    (sqlite3 releases the GIL while it executes). Errors raised while
+    reading are re-raised here.
+    """
+    batches: "queue.Queue[tuple]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item: tuple) -> bool:
+        # Give up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
             batch = []
-    if batch:
-        upsert_batch(conn, batch)
-        print(f"Inserted {len(batch)} apps")
+            for a in apps:
+                batch.append(a)
+                if len(batch) >= size:
+                    if not put((batch, None)):
+                        return
+                    batch = []
+            if batch and not put((batch, None)):
+                return
+            put((None, None))
+        except BaseException as e:
+            put((None, e))
 
+    threading.Thread(target=produce, name="applist-reader", daemon=True).start()
+    try:
+        while True:
+            batch, error = batches.get()
+            if error is not None:
+                raise error
+            if batch is None:
+                return
+            yield batch
+    finally:
+        stop.set()
+
+
+def drop_secondary_indexes(conn: sqlite3.Connection) -> list:
+    """Drop the explicitly created indexes on steam_apps and return their DDL."""
+    cur = conn.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type='index' AND tbl_name='steam_apps' AND sql IS NOT NULL"
+    )
+    indexes = cur.fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    return [ddl for _, ddl in indexes]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fetch the Steam app list into the local SQLite DB.")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "skip journaling and fsyncs while loading into a newly created DB; ignored for an "
+            "existing DB, where a crash mid-load could corrupt its reviews, settings and API keys"
+        ),
+    )
+    parser.add_argument(
+        "--deep-check",
+        action="store_true",
+        help="run the full PRAGMA integrity_check on an existing DB instead of quick_check",
+    )
+    args = parser.parse_args(argv)
 
-def main() -> int:
     print("Fetching app list from Steam...")
     try:
         apps = fetch_applist()
-        print(f"Fetched {len(apps)} apps")
     except Exception as e:
         print(f"Failed to fetch app list from Steam: {e}")
         return 1
@@ -151,7 +415,7 @@ def main() -> int:
         try:
             # Try to connect and check integrity
             test_conn = sqlite3.connect(str(DB_PATH))
-            if not check_db_integrity(test_conn):
+            if not check_db_integrity(test_conn, deep=args.deep_check):
                 print("Database integrity check failed - database appears corrupt")
                 test_conn.close()
                 if not backup_corrupt_db(DB_PATH):
@@ -167,9 +431,14 @@ def main() -> int:
                 print("Failed to backup corrupt database, continuing anyway...")
             db_exists = False
 
+    # Unsafe pragmas only for a file nothing else has been stored in yet
+    fast = args.fast and not DB_PATH.exists()
+    if args.fast and not fast:
+        print("Ignoring --fast: the database already exists and may hold reviews and settings")
+
     # Connect to database (will create if doesn't exist)
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = connect(DB_PATH)
         print(f"Connected to database at {DB_PATH}")
     except sqlite3.Error as e:
         print(f"Failed to connect to database: {e}")
@@ -178,16 +447,20 @@ def main() -> int:
     try:
         # Initialize database schema
         print("Initializing database schema...")
-        init_db(conn)
+        init_db(conn, fast=fast)
         
         # Insert apps
         print("Inserting apps...")
-        insert_apps_batch(conn, apps)
+        previous = table_fingerprint(conn)
+        total = insert_apps_batch(conn, apps)
+        print(f"Fetched {total} apps")
         
         # Populate FTS table
         print("Populating FTS table...")
         try:
-            populate_fts(conn)
+            populate_fts(conn, previous)
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
             print("Done.")
             return 0
         except sqlite3.DatabaseError as e:
@@ -202,12 +475,16 @@ def main() -> int:
             
             # Recreate clean DB and repopulate
             try:
-                conn = sqlite3.connect(str(DB_PATH))
+                # The corrupt file was moved aside, so this one is new
+                conn = connect(DB_PATH)
                 print("Recreating database...")
-                init_db(conn)
-                insert_apps_batch(conn, apps)
+                init_db(conn, fast=args.fast)
+                # The first stream is spent; fetch the list again
+                insert_apps_batch(conn, fetch_applist())
                 print("Re-populating FTS table...")
                 populate_fts(conn)
+                conn.execute("PRAGMA optimize")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
                 print("Done (recreated DB).")
                 return 0
             except Exception as ex:
@@ -0,0 +1,6 @@
+import os
+
+# Loaded by pytest before any test module: point the backend at an in-memory
+# database before anything imports `backend`, so the module-level engine can
+# never bind to the project's real app.db.
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
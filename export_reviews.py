@@ -1,12 +1,30 @@
 ﻿import sqlite3, csv
 conn=sqlite3.connect("app.db")
+# Read-only export: bigger page cache and mmap for the full-table scan
+for pragma in ("PRAGMA mmap_size=536870912","PRAGMA cache_size=-131072","PRAGMA temp_store=MEMORY","PRAGMA query_only=1"):
+    conn.execute(pragma)
 cur=conn.cursor()
 cur.execute("SELECT * FROM reviews")
 cols=[d[0] for d in cur.description]
-rows=cur.fetchall()
-with open("reviews_dump.csv","w",newline="",encoding="utf-8") as f:
-    w=csv.writer(f)
-    w.writerow(cols)
-    w.writerows(rows)
+def csv_field(v):
+    # Same output as csv.writer's QUOTE_MINIMAL, but one str scan per field
+    # instead of per-character quoting, which dominates on long review text
+    if v is None:
+        return ""
+    s=v if isinstance(v,str) else str(v)
+    if '"' in s:
+        return '"'+s.replace('"','""')+'"'
+    if "," in s or "\n" in s or "\r" in s:
+        return '"'+s+'"'
+    return s
+
+# Stream rows from the cursor instead of fetchall(); 1 MiB write buffer
+with open("reviews_dump.csv","w",newline="",encoding="utf-8",buffering=1<<20) as f:
+    csv.writer(f).writerow(cols)
+    while True:
+        rows=cur.fetchmany(10000)
+        if not rows:
+            break
+        f.write("".join(",".join(map(csv_field,r))+"\r\n" for r in rows))
 print("EXPORT_OK")
 conn.close()
@@ -9,9 +9,11 @@ interface Props {
 	onAdd: (game: Game) => void;
 	activeGames: Game[];
 	total?: number;
+	// `total` is only a lower bound
+	totalIsLowerBound?: boolean;
 }
 
-export const GameList: React.FC<Props> = ({ games, onAdd, activeGames, total }) => {
+export const GameList: React.FC<Props> = ({ games, onAdd, activeGames, total, totalIsLowerBound }) => {
 	const activeSet = new Set(activeGames.map((g) => g.app_id));
 	const BACKEND_URL = (import.meta as any).env.VITE_BACKEND_URL || "http://127.0.0.1:8000";
 
@@ -25,7 +27,7 @@ export const GameList: React.FC<Props> = ({ games, onAdd, activeGames, total })
 				<Card>
 					{/* Total line inside the card */}
 					<div className="px-4 pt-2 text-sm text-muted-foreground">
-						{typeof total === "number" ? `Showing ${games.length} of ${total} results` : `Showing ${games.length} results`}
+						{typeof total === "number" ? `Showing ${games.length} of ${total}${totalIsLowerBound ? "+" : ""} results` : `Showing ${games.length} results`}
 					</div>
 
 					<div className="overflow-y-auto max-h-64">
@@ -107,7 +107,7 @@ export const GameSelector: React.FC = () => {
       const resp: GameSearchResponse = await searchGames(q, s, PAGE_SIZE);
       setSearchResults(resp.games);
       setTotalResults(resp.total);
-      setHasMore(resp.games.length === PAGE_SIZE);
+      setHasMore(resp.has_more ?? resp.games.length === PAGE_SIZE);
       setStart(s);
     } catch (e: any) {
       const msg = e.message || "Search failed";
@@ -275,7 +275,7 @@ export const GameSelector: React.FC = () => {
                 <p className="text-sm text-muted-foreground">Search by game name or Steam App ID</p>
               </div>
               <div className="text-xs text-muted-foreground bg-muted px-2 py-1 rounded">
-                {totalResults ? `${totalResults.toLocaleString()} games available` : "Ready to search"}
+                {totalResults ? `${totalResults.toLocaleString()}${hasMore ? "+" : ""} games available` : "Ready to search"}
               </div>
             </div>
             
@@ -297,7 +297,7 @@ export const GameSelector: React.FC = () => {
                 </div>
               ) : (
                 <>
-                  <GameList games={searchResults} onAdd={handleAdd} activeGames={activeGames} total={totalResults} />
+                  <GameList games={searchResults} onAdd={handleAdd} activeGames={activeGames} total={totalResults} totalIsLowerBound={hasMore} />
 
                   {/* Enhanced pagination */}
                   {searchResults.length > 0 && (
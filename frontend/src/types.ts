@@ -5,9 +5,11 @@ export interface Game {
 
 export interface GameSearchResponse {
   games: Game[];
+  // Lower bound when has_more is true (local name searches stop counting one past the page)
   total?: number;
   start: number;
   count: number;
+  has_more?: boolean;
 }
 
 
@@ -1,28 +1,68 @@
-import os
 from typing import Generator
 
 import pytest
 from fastapi.testclient import TestClient
 
 
-@pytest.fixture(autouse=True)
-def set_temp_db_env(tmp_path) -> Generator[None, None, None]:
-	# Point DATABASE_URL to a temp SQLite db before app import
-	db_path = tmp_path / "test.db"
-	os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
-	yield
-	# Nothing to cleanup; file is in tmp_path
+@pytest.fixture(scope="session")
+def app_client() -> Generator[TestClient, None, None]:
+	# The app and its schema are built once and shared by every test, on an
+	# engine of its own (conftest.py already keeps the default engine off
+	# app.db); nothing is ever dropped
+	from sqlalchemy.orm import sessionmaker
+	import backend.database as database_module
+	from backend.config import settings
+	from backend.main import create_app
+
+	url = "sqlite:///:memory:"
+	engine = database_module.create_engine_for_url(url)
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr(settings, "DATABASE_URL", url)
+		mp.setattr(database_module, "engine", engine)
+		mp.setattr(database_module, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+		yield TestClient(create_app())
+	engine.dispose()
 
 
 @pytest.fixture()
-def client(set_temp_db_env) -> TestClient:
-	from backend.main import create_app
-	from backend.database import Base, engine
-	# Ensure fresh tables per test
-	Base.metadata.drop_all(bind=engine)
-	Base.metadata.create_all(bind=engine)
-	app = create_app()
-	return TestClient(app)
+def client(app_client: TestClient, monkeypatch) -> Generator[TestClient, None, None]:
+	# Run each test inside a transaction that is rolled back afterwards; the
+	# app's commits only release SAVEPOINTs within it. Besides get_db, the
+	# modules that open SessionLocal() directly (background exports, the
+	# scraper) get sessions on the same connection. Work those hand to
+	# other threads (the scraper's writer) can't share it, so tests that
+	# run the scraper belong in tests/test_scraper.py with its own database.
+	from sqlalchemy import event
+	from sqlalchemy.orm import Session, sessionmaker
+	import backend.database as database_module
+	import backend.routers.reviews as reviews_module
+	import backend.scraper_service as scraper_module
+	from backend.database import engine, get_db
+
+	conn = engine.connect()
+	# pysqlite defers BEGIN and breaks SAVEPOINT; issue BEGIN explicitly
+	driver_conn = conn.connection.driver_connection
+	isolation_level = driver_conn.isolation_level
+	driver_conn.isolation_level = None
+	event.listen(conn, "begin", lambda c: c.exec_driver_sql("BEGIN"))
+	trans = conn.begin()
+	db = Session(bind=conn, join_transaction_mode="create_savepoint")
+	session_local = sessionmaker(bind=conn, autoflush=False, join_transaction_mode="create_savepoint")
+	for module in (database_module, reviews_module, scraper_module):
+		monkeypatch.setattr(module, "SessionLocal", session_local)
+
+	def override_get_db():
+		yield db
+
+	app_client.app.dependency_overrides[get_db] = override_get_db
+	try:
+		yield app_client
+	finally:
+		app_client.app.dependency_overrides.pop(get_db, None)
+		db.close()
+		trans.rollback()
+		driver_conn.isolation_level = isolation_level
+		conn.close()
 
 
 def test_add_game(client: TestClient):
@@ -91,3 +131,146 @@ def test_search_by_appid_realtime(client: TestClient, monkeypatch):
 	assert all(r["app_id"] != 570 for r in resp_active.json())
 
 
+def test_search_local_reports_has_more(client: TestClient, monkeypatch):
+	from backend import search_sqlite
+
+	def mock_search(query: str, start: int = 0, count: int = 200):
+		# Name search: one row past the page was seen, so the total is a lower bound
+		games = [{"app_id": i, "name": f"Star {i}"} for i in range(start, start + count)]
+		return (games, start + count + 1)
+
+	monkeypatch.setattr(search_sqlite, "search_local_apps", mock_search)
+	data = client.get("/games/search_local", params={"query": "star", "count": 2}).json()
+	assert data["total"] == 3
+	assert data["has_more"] is True
+
+	def mock_last_page(query: str, start: int = 0, count: int = 200):
+		return ([{"app_id": 1, "name": "Star 1"}], start + 1)
+
+	monkeypatch.setattr(search_sqlite, "search_local_apps", mock_last_page)
+	data = client.get("/games/search_local", params={"query": "star", "count": 2}).json()
+	assert data["total"] == 1
+	assert data["has_more"] is False
+
+
+def _seed_reviews(app_id: int, n: int) -> None:
+	# Through SessionLocal, which the client fixture binds to its transaction
+	from datetime import datetime, timezone
+	from backend import models
+	from backend.database import SessionLocal
+
+	db = SessionLocal()
+	try:
+		db.add(models.Game(app_id=app_id, name=f"Game {app_id}"))
+		for i in range(n):
+			db.add(models.Review(
+				review_id=f"{app_id}-{i}",
+				app_id=app_id,
+				review_text=f"review {i}",
+				review_date=datetime(2024, 1, i + 1, tzinfo=timezone.utc),
+				review_type="positive",
+				language="english",
+			))
+		db.commit()
+	finally:
+		db.close()
+
+
+def test_background_export_roundtrip(client: TestClient, monkeypatch, tmp_path):
+	from backend.config import settings
+
+	monkeypatch.setattr(settings, "EXPORTS_DIR", str(tmp_path))
+	_seed_reviews(900, 3)
+
+	# TestClient runs background tasks before returning the response
+	resp = client.post("/reviews/export/900", params={"format": "csv"})
+	assert resp.status_code == 202
+	job = resp.json()
+
+	status = client.get(job["status_url"]).json()
+	assert status["status"] == "done"
+	assert "path" not in status
+
+	download = client.get(job["download_url"])
+	assert download.status_code == 200
+	lines = download.text.strip().splitlines()
+	assert len(lines) == 4  # header + 3 reviews
+
+
+def test_background_export_errors(client: TestClient, monkeypatch, tmp_path):
+	from backend.config import settings
+	from backend.routers import reviews as reviews_module
+
+	monkeypatch.setattr(settings, "EXPORTS_DIR", str(tmp_path))
+	assert client.post("/reviews/export/901").status_code == 404
+	assert client.get("/reviews/export/status/missing").status_code == 404
+	assert client.get("/reviews/export/download/missing").status_code == 404
+
+	# A job that hasn't finished yet can't be downloaded
+	_seed_reviews(901, 1)
+	monkeypatch.setattr(reviews_module, "_build_export", lambda job_id: None)
+	job = client.post("/reviews/export/901").json()
+	assert client.get(job["download_url"]).status_code == 409
+	reviews_module._export_jobs.pop(job["job_id"])
+
+
+def test_background_export_failure_and_expiry(client: TestClient, monkeypatch, tmp_path):
+	from backend.config import settings
+	from backend.routers import reviews as reviews_module
+
+	monkeypatch.setattr(settings, "EXPORTS_DIR", str(tmp_path))
+	_seed_reviews(902, 2)
+
+	export_rows = reviews_module._export_rows
+
+	def broken_rows(db, app_id):
+		yield from export_rows(db, app_id)
+		raise RuntimeError("disk on fire")
+
+	with monkeypatch.context() as m:
+		m.setattr(reviews_module, "_export_rows", broken_rows)
+		failed = client.post("/reviews/export/902").json()
+	status = client.get(failed["status_url"]).json()
+	assert status["status"] == "failed"
+	assert "disk on fire" in status["error"]
+	# The half-written file is removed
+	assert list(tmp_path.iterdir()) == []
+
+	done = client.post("/reviews/export/902").json()
+	assert len(list(tmp_path.iterdir())) == 1
+
+	# Once past the TTL, the next export prunes finished jobs and their files
+	monkeypatch.setattr(reviews_module, "EXPORT_JOB_TTL_SECONDS", -1)
+	monkeypatch.setattr(reviews_module, "_build_export", lambda job_id: None)
+	pending = client.post("/reviews/export/902").json()
+	assert client.get(done["status_url"]).status_code == 404
+	assert client.get(failed["status_url"]).status_code == 404
+	assert list(tmp_path.iterdir()) == []
+	reviews_module._export_jobs.pop(pending["job_id"])
+
+
+def test_shared_http_client_is_bound_to_its_loop():
+	import asyncio
+	from backend import http_clients
+
+	async def get():
+		return http_clients.get_client()
+
+	loop = asyncio.new_event_loop()
+	try:
+		first = loop.run_until_complete(get())
+		assert loop.run_until_complete(get()) is first
+		# Not closed on its own loop yet: another loop can't take it over
+		with pytest.raises(RuntimeError, match="another event loop"):
+			asyncio.run(get())
+		loop.run_until_complete(http_clients.close_client())
+	finally:
+		loop.close()
+	assert first.is_closed
+
+	async def get_and_close():
+		client = http_clients.get_client()
+		await http_clients.close_client()
+		return client
+
+	assert asyncio.run(get_and_close()) is not first
@@ -0,0 +1,135 @@
+import sqlite3
+from typing import List
+
+import pytest
+
+from backend.tools import fetch_applist
+
+
+@pytest.fixture()
+def conn(tmp_path):
+	# A real file, as main() uses: WAL and the FTS shadow tables behave as in app.db
+	conn = fetch_applist.connect(tmp_path / "app.db")
+	fetch_applist.init_db(conn)
+	yield conn
+	conn.close()
+
+
+def load(conn: sqlite3.Connection, apps: List[dict]) -> None:
+	# Same sequence as main()
+	previous = fetch_applist.table_fingerprint(conn)
+	fetch_applist.insert_apps_batch(conn, apps)
+	fetch_applist.populate_fts(conn, previous)
+
+
+def fts_match(conn: sqlite3.Connection, query: str) -> List[int]:
+	rows = conn.execute("SELECT rowid FROM steam_apps_fts WHERE steam_apps_fts MATCH ? ORDER BY rowid", (query,))
+	return [r[0] for r in rows]
+
+
+def trigram_match(conn: sqlite3.Connection, substring: str) -> List[int]:
+	# The substring lookup search_sqlite runs through the trigram index
+	rows = conn.execute(
+		"SELECT rowid FROM steam_apps_trigram WHERE name LIKE ? ORDER BY rowid",
+		(f"%{substring}%",),
+	)
+	return [r[0] for r in rows]
+
+
+def integrity_ok(conn: sqlite3.Connection) -> None:
+	# Raises if an external-content index disagrees with steam_apps
+	conn.execute("INSERT INTO steam_apps_fts(steam_apps_fts) VALUES('integrity-check')")
+	conn.execute("INSERT INTO steam_apps_trigram(steam_apps_trigram) VALUES('integrity-check')")
+
+
+APPS = [
+	{"app_id": 10, "name": "Counter-Strike"},
+	{"app_id": 570, "name": "Dota 2"},
+	{"app_id": 413150, "name": "Stardew Valley"},
+]
+
+
+def test_upsert_batch_counts_only_new_or_renamed(conn):
+	cur = conn.cursor()
+	fetch_applist.create_stage_tables(cur)
+	assert fetch_applist.upsert_batch(cur, APPS) == 3
+	# Unchanged apps are left alone and not counted
+	assert fetch_applist.upsert_batch(cur, APPS) == 0
+	renamed = [{"app_id": 570, "name": "Dota 2 Reborn"}, {"app_id": 730, "name": "Counter-Strike 2"}]
+	assert fetch_applist.upsert_batch(cur, APPS[:1] + renamed) == 2
+	conn.commit()
+
+	names = dict(conn.execute("SELECT app_id, name FROM steam_apps"))
+	assert names == {10: "Counter-Strike", 570: "Dota 2 Reborn", 413150: "Stardew Valley", 730: "Counter-Strike 2"}
+
+
+def test_upsert_batch_later_duplicate_wins(conn):
+	cur = conn.cursor()
+	fetch_applist.create_stage_tables(cur)
+	batch = [{"app_id": 1, "name": "First"}, {"app_id": 1, "name": "Second \"quoted\""}]
+	assert fetch_applist.upsert_batch(cur, batch) == 1
+	name, raw = conn.execute("SELECT name, raw FROM steam_apps WHERE app_id = 1").fetchone()
+	assert name == 'Second "quoted"'
+	assert raw == '{"app_id": 1, "name": "Second \\"quoted\\""}'
+
+
+def test_insert_apps_batch_returns_total(conn):
+	assert fetch_applist.insert_apps_batch(conn, APPS) == 3
+	assert conn.execute("SELECT COUNT(*) FROM steam_apps").fetchone()[0] == 3
+
+
+def test_populate_fts_initial_load(conn):
+	load(conn, APPS)
+	assert fts_match(conn, "stardew") == [413150]
+	assert fts_match(conn, "dota*") == [570]
+	assert trigram_match(conn, "dew") == [413150]
+	integrity_ok(conn)
+
+
+def test_populate_fts_patches_renamed_and_new_apps(conn, capsys):
+	load(conn, APPS)
+	capsys.readouterr()
+
+	load(conn, [
+		{"app_id": 570, "name": "Defense of the Ancients"},
+		{"app_id": 730, "name": "Counter-Strike 2"},
+	])
+	out = capsys.readouterr().out
+	assert "Updating FTS indexes for 2 new or renamed apps" in out
+	assert "Rebuilding FTS table" not in out
+
+	# The old name's tokens are gone, the new name and the new app are found
+	assert fts_match(conn, "dota") == []
+	assert fts_match(conn, "ancients") == [570]
+	assert fts_match(conn, "counter") == [10, 730]
+	assert trigram_match(conn, "ncient") == [570]
+	assert trigram_match(conn, "Dota") == []
+	integrity_ok(conn)
+
+
+def test_populate_fts_noop_rerun(conn, capsys):
+	load(conn, APPS)
+	capsys.readouterr()
+
+	load(conn, APPS)
+	out = capsys.readouterr().out
+	assert "FTS table already up to date" in out
+	assert fts_match(conn, "stardew") == [413150]
+	integrity_ok(conn)
+
+
+def test_populate_fts_rebuilds_on_stale_fingerprint(conn, capsys):
+	load(conn, APPS)
+	# steam_apps changed behind the tool's back, so the stored fingerprint
+	# no longer describes what the index was built from
+	conn.execute("UPDATE steam_apps SET name = 'Half-Life' WHERE app_id = 10")
+	conn.commit()
+	capsys.readouterr()
+
+	load(conn, [{"app_id": 220, "name": "Half-Life 2"}])
+	out = capsys.readouterr().out
+	assert "Rebuilding FTS table" in out
+	assert fts_match(conn, "counter") == []
+	assert fts_match(conn, "half") == [10, 220]
+	assert trigram_match(conn, "alf-Li") == [10, 220]
+	integrity_ok(conn)
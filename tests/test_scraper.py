@@ -1,39 +1,55 @@
 import asyncio
-import os
+import json
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 
 @pytest.fixture(autouse=True)
-def fresh_db(tmp_path):
-	# Isolate DB per test to avoid cross-test contamination
-	db_path = tmp_path / "test_scraper.db"
-	os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
-	from importlib import reload
-	import backend.config as config_module
+def fresh_db(monkeypatch):
+	# Isolate DB per test to avoid cross-test contamination: a new engine on a
+	# private in-memory database is swapped in, instead of reloading the
+	# backend modules
+	from sqlalchemy.orm import sessionmaker
 	import backend.database as database_module
-
-	reload(config_module)
-	reload(database_module)
-	import backend.models as models_module
-	reload(models_module)
 	import backend.scraper_service as scraper_module
-	reload(scraper_module)
-	# Recreate tables
-	models_module.Base.metadata.drop_all(bind=database_module.engine)
-	models_module.Base.metadata.create_all(bind=database_module.engine)
+	from backend.config import settings
+	from backend.models import Base
+
+	url = "sqlite:///:memory:"
+	engine = database_module.create_engine_for_url(url)
+	session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+	monkeypatch.setenv("DATABASE_URL", url)
+	monkeypatch.setattr(settings, "DATABASE_URL", url)
+	monkeypatch.setattr(database_module, "engine", engine)
+	monkeypatch.setattr(database_module, "SessionLocal", session_local)
+	monkeypatch.setattr(scraper_module, "SessionLocal", session_local)
+	# Fresh scraper state (progress, limiters, page cache) per test
+	service = scraper_module.ScraperService()
+	monkeypatch.setattr(scraper_module, "scraper_service", service)
+	Base.metadata.create_all(bind=engine)
 	yield
+	service._writer.shutdown(wait=True)
+	engine.dispose()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def shared_http_client():
+	# Scrapes pick up the shared client on the test's event loop; close it
+	# there so the next test's loop can create its own
+	from backend import http_clients
+
+	yield
+	await http_clients.close_client()
 
 
 @pytest.fixture()
 def client() -> TestClient:
+	# fresh_db has already swapped in an empty per-test database
 	from backend.main import create_app
-	from backend.database import Base, engine
-	Base.metadata.drop_all(bind=engine)
-	Base.metadata.create_all(bind=engine)
 	app = create_app()
 	return TestClient(app)
 
@@ -69,6 +85,7 @@ async def test_scrape_single_game_sequential(monkeypatch):
 		def __init__(self, payload: dict, status_code: int = 200):
 			self._payload = payload
 			self.status_code = status_code
+			self.headers = {}
 
 		def raise_for_status(self):
 			if self.status_code >= 400:
@@ -77,6 +94,10 @@ async def test_scrape_single_game_sequential(monkeypatch):
 		def json(self):
 			return self._payload
 
+		@property
+		def content(self) -> bytes:
+			return json.dumps(self._payload).encode()
+
 	pages = [
 		{"reviews": [make_review(1, 1)], "query_summary": {"total_reviews": 2}, "cursor": "c1"},
 		{"reviews": [make_review(2, 2)], "query_summary": {"total_reviews": 2}, "cursor": "c2"},
@@ -108,8 +129,7 @@ async def test_scrape_single_game_sequential(monkeypatch):
 	})
 
 	# Wait for task to finish
-	while scraper_service.progress.is_running:
-		await asyncio.sleep(0.01)
+	await asyncio.wait_for(scraper_service.progress.finished.wait(), timeout=10)
 
 	# Check saved reviews
 	db = SessionLocal()
@@ -149,6 +169,7 @@ async def test_filters_and_stop(monkeypatch):
 		def __init__(self, payload: dict, status_code: int = 200):
 			self._payload = payload
 			self.status_code = status_code
+			self.headers = {}
 
 		def raise_for_status(self):
 			if self.status_code >= 400:
@@ -157,6 +178,10 @@ async def test_filters_and_stop(monkeypatch):
 		def json(self):
 			return self._payload
 
+		@property
+		def content(self) -> bytes:
+			return json.dumps(self._payload).encode()
+
 	async def mock_get(url, params=None):
 		idx = call_idx["i"]
 		call_idx["i"] += 1
@@ -189,20 +214,252 @@ async def test_filters_and_stop(monkeypatch):
 	})
 
 	# Request stop after first response is processed
-	await asyncio.sleep(0.01)
+	await asyncio.wait_for(scraper_service.progress.page_saved.wait(), timeout=10)
 	await scraper_service.stop()
 
 	# Wait until not running
-	while scraper_service.progress.is_running:
-		await asyncio.sleep(0.01)
+	await asyncio.wait_for(scraper_service.progress.finished.wait(), timeout=10)
 
 	# Validate that filters applied: From first page, only id=10 passes (11 early, 12 wrong lang), from second page id=13 is outside end_date
 	db = SessionLocal()
 	try:
 		rows = db.query(models.Review).filter(models.Review.app_id == 2).all()
-		# Depending on stop timing, at least first page filtered result should be saved
+		# Stop is requested after the first page is saved, so its filtered result is there
 		assert any(r.review_id == "10" for r in rows)
 	finally:
 		db.close()
 
 
+
+
+@pytest.mark.asyncio
+async def test_parallel_games_keep_separate_progress(monkeypatch):
+	from backend.database import SessionLocal
+	from backend import models
+	from backend.scraper_service import scraper_service
+
+	db = SessionLocal()
+	db.add_all([models.Game(app_id=3, name="Game 3"), models.Game(app_id=4, name="Game 4")])
+	db.commit()
+	db.close()
+
+	# Each game reports its own store total; two pages of one review each
+	store_totals = {"3": 5, "4": 7}
+
+	class MockResponse:
+		def __init__(self, payload: dict, status_code: int = 200):
+			self._payload = payload
+			self.status_code = status_code
+			self.headers = {}
+
+		def raise_for_status(self):
+			if self.status_code >= 400:
+				raise RuntimeError("error")
+
+		@property
+		def content(self) -> bytes:
+			return json.dumps(self._payload).encode()
+
+	class DummyClient:
+		def __init__(self, *a, **k):
+			pass
+		async def get(self, url, params=None):
+			app_id = url.rsplit("/", 1)[-1]
+			page = {"*": 1, "c1": 2}.get(params["cursor"])
+			if page is None:
+				return MockResponse({"reviews": [], "query_summary": {"total_reviews": 0}})
+			# Yield so the two games' pages interleave
+			await asyncio.sleep(0)
+			review = make_review(int(app_id) * 100 + page, page)
+			return MockResponse({"reviews": [review], "query_summary": {"total_reviews": store_totals[app_id]}, "cursor": f"c{page}"})
+		async def aclose(self):
+			return None
+
+	monkeypatch.setattr("backend.scraper_service.httpx.AsyncClient", DummyClient)
+
+	await scraper_service.start({
+		"global_settings": {"max_reviews": 10, "rate_limit_rpm": 1000, "language": "english"},
+		"per_game_overrides": {},
+		"max_parallel_games": 2,
+	})
+	await asyncio.wait_for(scraper_service.progress.finished.wait(), timeout=10)
+
+	progress = scraper_service.progress
+	# Both games set their own share of the global estimate
+	assert progress.per_game_estimates == {3: 5, 4: 7}
+	assert progress.global_total == 12
+	assert progress.global_scraped == 4
+	assert progress.current_game is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_retries_transient_errors(monkeypatch):
+	import backend.scraper_service as scraper_module
+	from backend.scraper_service import ScrapeSettings, scraper_service
+
+	class MockResponse:
+		def __init__(self, payload: dict, status_code: int = 200, headers: Any = None):
+			self._payload = payload
+			self.status_code = status_code
+			self.headers = headers or {}
+
+		def raise_for_status(self):
+			if self.status_code >= 400:
+				raise RuntimeError(f"status {self.status_code}")
+
+		@property
+		def content(self) -> bytes:
+			return json.dumps(self._payload).encode()
+
+	page = {"reviews": [make_review(1, 1)], "query_summary": {"total_reviews": 1}, "cursor": "c1"}
+
+	class DummyClient:
+		def __init__(self, responses):
+			self.responses = list(responses)
+			self.calls = 0
+		async def get(self, url, params=None, headers=None):
+			self.calls += 1
+			return self.responses.pop(0)
+
+	# Record the backoff instead of waiting it out
+	sleeps = []
+
+	async def fake_sleep(delay):
+		sleeps.append(delay)
+
+	monkeypatch.setattr(scraper_module.asyncio, "sleep", fake_sleep)
+	settings = ScrapeSettings(rate_limit_rpm=1000, language="english")
+
+	# 429 honours Retry-After; 503 without it backs off exponentially
+	scraper_service._client = DummyClient([
+		MockResponse({}, 429, {"retry-after": "7"}),
+		MockResponse({}, 503),
+		MockResponse(page),
+	])
+	assert await scraper_service._fetch_page(1, "*", settings) == page
+	assert scraper_service._client.calls == 3
+	assert 7 <= sleeps[0] <= 7.5
+	assert 2 <= sleeps[1] <= 3
+
+	# Errors outside the retry set fail at once
+	sleeps.clear()
+	scraper_service._client = DummyClient([MockResponse({}, 404)])
+	with pytest.raises(RuntimeError, match="404"):
+		await scraper_service._fetch_page(1, "*", settings)
+	assert sleeps == []
+
+	# A transient error that persists is raised after the last attempt
+	attempts = scraper_module._FETCH_MAX_ATTEMPTS
+	scraper_service._client = DummyClient([MockResponse({}, 503) for _ in range(attempts)])
+	with pytest.raises(RuntimeError, match="503"):
+		await scraper_service._fetch_page(1, "*", settings)
+	assert scraper_service._client.calls == attempts
+	assert len(sleeps) == attempts - 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_window(monkeypatch):
+	import backend.scraper_service as scraper_module
+	from backend.scraper_service import scraper_service
+
+	# Fake clock: sleeping advances it instead of waiting
+	now = [1000.0]
+
+	class FakeTime:
+		@staticmethod
+		def monotonic():
+			return now[0]
+
+	async def fake_sleep(delay):
+		now[0] += delay
+
+	monkeypatch.setattr(scraper_module, "time", FakeTime)
+	monkeypatch.setattr(scraper_module.asyncio, "sleep", fake_sleep)
+
+	async def send(rpm: int):
+		await scraper_service._wait_for_request_slot(rpm)
+		sent.append(now[0])
+		# Each request takes a little while to answer
+		now[0] += 0.5
+
+	# Concurrent senders (games) draw on the same budget
+	sent = []
+	await asyncio.gather(*(send(10) for _ in range(35)))
+	assert len(sent) == 35
+	for t in sent:
+		assert sum(1 for u in sent if t <= u < t + 60) <= 10
+	# No burst beyond the cap, but no idle time either: one window per 10 requests
+	assert sent[10] - sent[0] == pytest.approx(60)
+	assert sent[30] - sent[0] == pytest.approx(180)
+
+
+def test_review_filter_accepts_non_finite_playtime_bounds():
+	from backend.scraper_service import ScrapeSettings, _compile_review_filter
+
+	# e.g. `1e999` in the request JSON parses to inf
+	keep = _compile_review_filter(ScrapeSettings(rate_limit_rpm=60, language="english", min_playtime=1, max_playtime=float("inf")))
+	assert keep(make_review(1, 1))  # 2 hours played
+	keep = _compile_review_filter(ScrapeSettings(rate_limit_rpm=60, language="english", min_playtime=float("-inf"), max_playtime=1))
+	assert not keep(make_review(1, 1))
+	keep = _compile_review_filter(ScrapeSettings(rate_limit_rpm=60, language="english", max_playtime=float("nan")))
+	assert not keep(make_review(1, 1))
+
+
+@pytest.mark.asyncio
+async def test_capped_scrape_skips_unneeded_prefetch(monkeypatch):
+	from backend.database import SessionLocal
+	from backend import models
+	from backend.scraper_service import scraper_service
+
+	db = SessionLocal()
+	db.add(models.Game(app_id=5, name="Game 5"))
+	db.commit()
+	db.close()
+
+	pages = {
+		# The repeated review leaves the first page one short of the cap
+		"*": {"reviews": [make_review(50, 100), make_review(50, 100)], "query_summary": {"total_reviews": 6}, "cursor": "c1"},
+		"c1": {"reviews": [make_review(52, 90), make_review(53, 90)], "query_summary": {}, "cursor": "c2"},
+		"c2": {"reviews": [make_review(54, 80), make_review(55, 80)], "query_summary": {}, "cursor": "c3"},
+	}
+	requested = []
+
+	class MockResponse:
+		def __init__(self, payload: dict):
+			self._payload = payload
+			self.status_code = 200
+			self.headers = {}
+
+		def raise_for_status(self):
+			pass
+
+		@property
+		def content(self) -> bytes:
+			return json.dumps(self._payload).encode()
+
+	class DummyClient:
+		def __init__(self, *a, **k):
+			pass
+		async def get(self, url, params=None):
+			requested.append(params["cursor"])
+			return MockResponse(pages[params["cursor"]])
+		async def aclose(self):
+			return None
+
+	monkeypatch.setattr("backend.scraper_service.httpx.AsyncClient", DummyClient)
+
+	await scraper_service.start({
+		"global_settings": {"max_reviews": 2, "rate_limit_rpm": 1000, "language": "english"},
+		"per_game_overrides": {},
+	})
+	await asyncio.wait_for(scraper_service.progress.finished.wait(), timeout=10)
+
+	# Page 1 could fill the cap, so c1 is only fetched once the save fell
+	# short; c1 then fills it and c2 is never requested
+	assert requested == ["*", "c1"]
+	db = SessionLocal()
+	try:
+		ids = {r.review_id for r in db.query(models.Review).filter(models.Review.app_id == 5)}
+		assert ids == {"50", "52"}
+	finally:
+		db.close()